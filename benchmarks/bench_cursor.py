@@ -0,0 +1,134 @@
+"""Replay benchmark for cursor filters: lag and jitter on cursor traces.
+
+Compares the legacy smoothing stack with the One Euro CursorFilter on the
+same input, either a synthetic trace with known ground truth or a recorded
+trace: a landmark trace from ``main.py --record`` (index fingertip mapped
+to the screen) or an .npz with ``t``, ``x`` and ``y`` arrays in screen pixels.
+
+    python -m benchmarks.bench_cursor
+    python -m benchmarks.bench_cursor session.hgt --json
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from cursor_filter import CursorFilter, LegacySmoother
+from trace_io import TraceReader
+
+
+def synthetic_trace(seconds=20.0, fps=30.0, noise_px=4.0, screen=(1920, 1080), seed=0):
+    """Minimum-jerk moves between random targets with holds, plus landmark noise."""
+    rng = np.random.default_rng(seed)
+    n = int(seconds * fps)
+    t = np.arange(n) / fps
+    truth = np.empty((n, 2))
+    pos = np.array(screen, dtype=float) / 2
+    i = 0
+    while i < n:
+        target = rng.uniform([100, 100], [screen[0] - 100, screen[1] - 100])
+        move = int(rng.uniform(0.3, 0.8) * fps)
+        hold = int(rng.uniform(0.3, 1.0) * fps)
+        s = np.linspace(0, 1, move, endpoint=False)
+        s = 10 * s ** 3 - 15 * s ** 4 + 6 * s ** 5
+        segment = pos + (target - pos) * s[:, np.newaxis]
+        segment = np.vstack([segment, np.repeat(target[np.newaxis], hold, axis=0)])
+        take = min(len(segment), n - i)
+        truth[i:i + take] = segment[:take]
+        i += take
+        pos = target
+    raw = truth + rng.normal(0, noise_px, truth.shape)
+    return t, raw, truth
+
+
+def reference_path(raw, window=7):
+    """Zero-phase moving average, used as ground truth for recorded traces."""
+    kernel = np.ones(window) / window
+    pad = window // 2
+    padded = np.pad(raw, ((pad, pad), (0, 0)), mode='edge')
+    return np.stack([np.convolve(padded[:, k], kernel, mode='valid') for k in range(2)], axis=1)
+
+
+def load_trace(path, screen=(1920, 1080)):
+    if path.endswith('.npz'):
+        data = np.load(path)
+        t = data['t'].astype(float)
+        raw = np.stack([data['x'], data['y']], axis=1).astype(float)
+    else:
+        samples = [(frame.timestamp, frame.points[0, 8, 0], frame.points[0, 8, 1])
+                   for frame in TraceReader(path) if len(frame.points)]
+        samples = np.array(samples, dtype=float).reshape(-1, 3)
+        t = samples[:, 0]
+        raw = samples[:, 1:] * screen
+    return t, raw, reference_path(raw)
+
+
+def run_filter(filter_fn, t, raw):
+    out = np.empty_like(raw)
+    start = time.perf_counter()
+    for i in range(len(t)):
+        out[i] = filter_fn(raw[i, 0], raw[i, 1], t[i])
+    elapsed = time.perf_counter() - start
+    return out, elapsed / max(len(t), 1)
+
+
+def evaluate(out, t, truth, max_shift=60):
+    """Lag (best time shift vs. truth), jitter on stationary frames, and RMS error."""
+    dt = float(np.mean(np.diff(t))) if len(t) > 1 else 1 / 30
+    errors = []
+    for shift in range(max_shift + 1):
+        diff = out[shift:] - truth[:len(truth) - shift]
+        errors.append(np.mean(np.linalg.norm(diff, axis=1)))
+    lag_frames = int(np.argmin(errors))
+
+    truth_speed = np.linalg.norm(np.diff(truth, axis=0), axis=1) / dt
+    stationary = truth_speed < 20.0
+    steps = np.linalg.norm(np.diff(out, axis=0), axis=1)
+    jitter = float(np.sqrt(np.mean(steps[stationary] ** 2))) if stationary.any() else 0.0
+
+    rmse = float(np.sqrt(np.mean(np.sum((out - truth) ** 2, axis=1))))
+    return {'lag_ms': lag_frames * dt * 1000, 'jitter_px': jitter, 'rmse_px': rmse}
+
+
+def benchmark(t, raw, truth):
+    filters = {
+        'legacy': LegacySmoother().filter,
+        'one_euro': CursorFilter().filter,
+    }
+    results = {}
+    for name, filter_fn in filters.items():
+        out, per_frame = run_filter(filter_fn, t, raw)
+        # Legacy stack starts at (0, 0); skip the first second so warm-up is not scored
+        warmup = min(len(t) // 4, int(round(1 / max(np.mean(np.diff(t)), 1e-6))))
+        metrics = evaluate(out[warmup:], t[warmup:], truth[warmup:])
+        metrics['us_per_frame'] = per_frame * 1e6
+        results[name] = metrics
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cursor filter lag/jitter benchmark")
+    parser.add_argument('trace', nargs='?', help="Landmark trace (.hgt) or .npz with t, x, y")
+    parser.add_argument('--fps', type=float, default=30.0, help="FPS of the synthetic trace")
+    parser.add_argument('--noise', type=float, default=4.0, help="Landmark noise in pixels")
+    parser.add_argument('--json', action='store_true', help="Print results as JSON")
+    args = parser.parse_args()
+
+    if args.trace:
+        t, raw, truth = load_trace(args.trace)
+    else:
+        t, raw, truth = synthetic_trace(fps=args.fps, noise_px=args.noise)
+
+    results = benchmark(t, raw, truth)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'filter':<10} {'lag ms':>8} {'jitter px':>10} {'rmse px':>8} {'us/frame':>9}")
+    for name, m in results.items():
+        print(f"{name:<10} {m['lag_ms']:8.1f} {m['jitter_px']:10.2f} {m['rmse_px']:8.1f} "
+              f"{m['us_per_frame']:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Frame path benchmark: allocations and latency of capture, mirror and color conversion.
+
+Compares the old path (cap.read() into a new array, cv2.flip returning a
+copy, a freshly allocated RGB/resized input for MediaPipe) with the reused
+buffer path the main loop now uses (decode into the previous frame, flip in
+place, ModernHandTracker.prepare_input writing into cached buffers).
+MediaPipe itself is not run, so only the frame handling is measured.
+
+    python -m benchmarks.bench_frame_path
+    python -m benchmarks.bench_frame_path --video clip.mp4 --json
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from benchmarks.suite import RESOLUTIONS, make_tracker
+
+
+class SyntheticCapture:
+    """Stands in for cv2.VideoCapture: "decodes" by copying prepared frames.
+
+    Like OpenCV, read() fills the array it is given when the shape matches
+    and allocates a new one otherwise.
+    """
+
+    def __init__(self, size, count=8, seed=0):
+        rng = np.random.default_rng(seed)
+        self.frames = [rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8)
+                       for _ in range(count)]
+        self.index = 0
+
+    def read(self, image=None):
+        frame = self.frames[self.index % len(self.frames)]
+        self.index += 1
+        if image is None or image.shape != frame.shape:
+            image = np.empty_like(frame)
+        np.copyto(image, frame)
+        return True, image
+
+
+class LoopingCapture:
+    """A video file that rewinds at the end, resized to the benchmark size."""
+
+    def __init__(self, path, size):
+        self.cap = cv2.VideoCapture(path)
+        self.size = size
+        self.raw = None
+
+    def read(self, image=None):
+        success, self.raw = self.cap.read(self.raw)
+        if not success:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            success, self.raw = self.cap.read(self.raw)
+        if image is None or image.shape[:2] != (self.size[1], self.size[0]):
+            image = np.empty((self.size[1], self.size[0], 3), dtype=np.uint8)
+        cv2.resize(self.raw, self.size, dst=image)
+        return success, image
+
+
+def legacy_steps(cap, inference_width):
+    state = {}
+
+    def read():
+        _, state['img'] = cap.read()
+
+    def flip():
+        state['img'] = cv2.flip(state['img'], 1)
+
+    def convert():
+        img = state['img']
+        h, w = img.shape[:2]
+        if inference_width and w > inference_width:
+            img = cv2.resize(img, (inference_width, max(1, round(h * inference_width / w))))
+        state['rgb'] = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+    return [('read', read), ('flip', flip), ('convert', convert)]
+
+
+def reused_steps(cap, tracker):
+    state = {'frame': None}
+
+    def read():
+        _, state['frame'] = cap.read(state['frame'])
+
+    def flip():
+        cv2.flip(state['frame'], 1, dst=state['frame'])
+
+    def convert():
+        state['rgb'] = tracker.prepare_input(state['frame'])
+
+    return [('read', read), ('flip', flip), ('convert', convert)]
+
+
+def run_path(steps, iterations, warmup=5):
+    """Per-frame latency, then bytes newly allocated by each step (tracemalloc pass)."""
+    for _ in range(warmup):
+        for _, step in steps:
+            step()
+
+    samples = np.empty(iterations)
+    for i in range(iterations):
+        start = time.perf_counter()
+        for _, step in steps:
+            step()
+        samples[i] = time.perf_counter() - start
+
+    # Each step allocates at most its output, so the peak rise within a step
+    # is the memory that step had to allocate
+    allocated = {name: 0 for name, _ in steps}
+    tracemalloc.start()
+    for _ in range(iterations):
+        for name, step in steps:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            step()
+            _, peak = tracemalloc.get_traced_memory()
+            allocated[name] += peak - before
+    tracemalloc.stop()
+
+    ms = samples * 1000.0
+    per_frame = sum(allocated.values()) / iterations
+    return {
+        'mean_ms': float(ms.mean()),
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p95_ms': float(np.percentile(ms, 95)),
+        'alloc_kb_per_frame': per_frame / 1024,
+        'alloc_mb_per_s_at_30fps': per_frame * 30 / (1024 * 1024),
+        'alloc_kb_by_step': {name: total / iterations / 1024 for name, total in allocated.items()},
+    }
+
+
+def benchmark(video=None, iterations=200, inference_width=640):
+    tracker = make_tracker()
+    tracker.inference_width = inference_width or None
+    results = {}
+    try:
+        for size in RESOLUTIONS:
+            def source():
+                return LoopingCapture(video, size) if video else SyntheticCapture(size)
+            key = f"{size[0]}x{size[1]}"
+            results[key] = {
+                'legacy': run_path(legacy_steps(source(), inference_width), iterations),
+                'reused': run_path(reused_steps(source(), tracker), iterations),
+            }
+    finally:
+        tracker.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Frame path allocation/latency benchmark")
+    parser.add_argument('--video', help="Video file instead of synthetic frames")
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--inference-width', type=int, default=640,
+                        help="Inference width (0 = full resolution)")
+    parser.add_argument('--json', action='store_true', help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = benchmark(args.video, args.iterations, args.inference_width)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'frame':<10} {'path':<7} {'mean ms':>8} {'p95 ms':>8} {'KB/frame':>10} {'MB/s@30':>8}")
+    for key, paths in results.items():
+        for name, r in paths.items():
+            print(f"{key:<10} {name:<7} {r['mean_ms']:8.2f} {r['p95_ms']:8.2f} "
+                  f"{r['alloc_kb_per_frame']:10.1f} {r['alloc_mb_per_s_at_30fps']:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+"""Per-stage benchmark suite on fixed inputs.
+
+Times each stage separately with percentiles and memory usage:
+find_hands at several resolutions and max_hands values, gesture feature
+extraction, cursor smoothing, air_drawing as strokes grow,
+draw_control_panel, and the frame overlay (landmarks plus HUD text) per
+overlay level. Results are written as JSON so releases can be compared.
+
+    python -m benchmarks.suite
+    python -m benchmarks.suite --video clip.mp4 --output results.json
+    python -m benchmarks.suite --stages gesture,smoothing
+"""
+import argparse
+import json
+import platform
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from enhanced_hand_tracker import EnhancedHandTracker
+from gesture_classifier import TemplateClassifier
+from landmarks import HAND_CONNECTIONS, HandLandmarks
+from overlay import OVERLAY_LEVELS, OverlayRenderer
+from replay import RecordingBackend
+
+RESOLUTIONS = ((640, 480), (1280, 720), (1920, 1080))
+MAX_HANDS = (1, 2)
+STAGES = ('find_hands', 'gesture', 'smoothing', 'drawing', 'control_panel', 'overlay')
+
+# Open palm in normalized coordinates, used as the base for synthetic hands
+OPEN_PALM = np.array([
+    [0.50, 0.85], [0.42, 0.80], [0.37, 0.73], [0.33, 0.67], [0.30, 0.62],
+    [0.44, 0.62], [0.42, 0.52], [0.41, 0.46], [0.40, 0.41],
+    [0.50, 0.60], [0.50, 0.49], [0.50, 0.42], [0.50, 0.37],
+    [0.56, 0.62], [0.57, 0.52], [0.58, 0.46], [0.59, 0.41],
+    [0.61, 0.65], [0.64, 0.57], [0.66, 0.52], [0.67, 0.48],
+], dtype=np.float32)
+
+
+def summarize(samples_ns):
+    samples = np.asarray(samples_ns, dtype=np.float64) / 1e6
+    return {
+        'n': int(len(samples)),
+        'mean_ms': float(samples.mean()),
+        'p50_ms': float(np.percentile(samples, 50)),
+        'p95_ms': float(np.percentile(samples, 95)),
+        'p99_ms': float(np.percentile(samples, 99)),
+        'max_ms': float(samples.max()),
+    }
+
+
+def measure(func, iterations, warmup=5, memory_iterations=20):
+    """Time ``func`` per call, then measure its allocations in a separate pass."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter_ns()
+        func()
+        samples.append(time.perf_counter_ns() - start)
+    result = summarize(samples)
+
+    # tracemalloc slows every allocation, so it never runs during the timed pass
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    for _ in range(memory_iterations):
+        func()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    result['peak_alloc_kb'] = (peak - before) / 1024
+    result['retained_kb'] = (current - before) / 1024
+    return result
+
+
+def synthetic_hands(tracker, count, shape, rng, noise=0.01):
+    points = np.zeros((count, 21, 3), dtype=np.float32)
+    points[:, :, :2] = OPEN_PALM + rng.normal(0, noise, (count, 21, 2))
+    return tracker.load_hands(points, ['Right'] * count, [0.95] * count, shape)
+
+
+def make_tracker(max_hands=2):
+    return EnhancedHandTracker(input_backend=RecordingBackend(), threaded_input=False,
+                               max_hands=max_hands)
+
+
+def load_frames(video, size, count=60):
+    """Frames from ``video`` resized to ``size``, or a noise frame when no video is given."""
+    if video is None:
+        rng = np.random.default_rng(0)
+        return [rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8)]
+    cap = cv2.VideoCapture(video)
+    frames = []
+    while len(frames) < count:
+        success, img = cap.read()
+        if not success:
+            break
+        frames.append(cv2.resize(img, size))
+    cap.release()
+    if not frames:
+        raise IOError(f"Tidak dapat membaca frame dari {video}")
+    return frames
+
+
+def bench_find_hands(args):
+    results = {}
+    for max_hands in MAX_HANDS:
+        tracker = make_tracker(max_hands)
+        for size in RESOLUTIONS:
+            frames = load_frames(args.video, size)
+            index = [0]
+
+            def step():
+                img = frames[index[0] % len(frames)].copy()
+                index[0] += 1
+                tracker.find_hands(img)
+
+            results[f"{size[0]}x{size[1]}/max_hands={max_hands}"] = measure(step, args.iterations)
+        tracker.close()
+    return results
+
+
+def bench_gesture(args):
+    tracker = make_tracker()
+    rng = np.random.default_rng(1)
+    frames = [synthetic_hands(tracker, 2, (480, 640), rng) for _ in range(4)]
+    # load_hands reuses a small ring, so keep copies that stay valid
+    hands = [HandLandmarks(frame[0].points.copy()) for frame in frames]
+    index = [0]
+
+    def angles():
+        hand = hands[index[0] % len(hands)]
+        index[0] += 1
+        hand.cache.clear()
+        tracker.calculate_finger_angles(hand)
+
+    def gesture():
+        hand = hands[index[0] % len(hands)]
+        index[0] += 1
+        hand.cache.clear()
+        tracker.get_gesture(hand)
+
+    # Template matching on both hands of a frame, against 500 templates
+    classifier = TemplateClassifier()
+    for label, offset in (('Open Palm', 0.0), ('Other', 0.05)):
+        templates = synthetic_hands(tracker, 2, (480, 640), rng).array.copy()
+        templates = np.repeat(templates, 125, axis=0)
+        templates[:, :, :2] += rng.normal(offset, 3.0, templates[:, :, :2].shape)
+        classifier.add(label, templates)
+    frame_points = np.stack([hand.points for hand in hands[:2]])
+
+    def template():
+        classifier.classify(frame_points, handedness=('Right', 'Right'))
+
+    results = {
+        'calculate_finger_angles': measure(angles, args.iterations),
+        'get_gesture': measure(gesture, args.iterations),
+        'template_classifier_2_hands': measure(template, args.iterations),
+    }
+    tracker.close()
+    return results
+
+
+def bench_smoothing(args):
+    tracker = make_tracker()
+    rng = np.random.default_rng(2)
+    positions = rng.integers(0, 1920, (1024, 2)).tolist()
+    index = [0]
+
+    def legacy():
+        tracker.advanced_mouse_smoothing(tuple(positions[index[0] % len(positions)]))
+        index[0] += 1
+
+    def one_euro():
+        i = index[0]
+        x, y = positions[i % len(positions)]
+        tracker.cursor_filter.filter(x, y, i / 30.0)
+        index[0] += 1
+
+    results = {
+        'advanced_mouse_smoothing': measure(legacy, args.iterations),
+        'cursor_filter': measure(one_euro, args.iterations),
+    }
+    tracker.close()
+    return results
+
+
+def bench_drawing(args):
+    """air_drawing frame time after the drawing has grown to N points."""
+    tracker = make_tracker()
+    tracker.max_drawing_points = 10 ** 9
+    img = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    rng = np.random.default_rng(3)
+    drawn = [0]
+    results = {}
+
+    def hand_at(x, y, drawing=True):
+        points = np.zeros((21, 3), dtype=np.float32)
+        points[:, 0], points[:, 1] = x, y
+        points[7, 1] = y - 30
+        points[8, 1] = y - 50 if drawing else y + 50
+        points[12, 1] = y + 20
+        return HandLandmarks(points)
+
+    def draw_point():
+        # Lift the finger every 200 points so the drawing is made of many strokes
+        drawn[0] += 1
+        if drawn[0] % 200 == 0:
+            tracker.air_drawing(hand_at(0, 0, drawing=False), img)
+        x, y = rng.uniform(100, 1800), rng.uniform(100, 1000)
+        tracker.air_drawing(hand_at(x, y), img)
+
+    for target in (0, 1000, 5000, 20000):
+        while drawn[0] < target:
+            draw_point()
+        result = measure(draw_point, args.iterations, memory_iterations=5)
+        result['drawing_memory_kb'] = tracker.drawing_memory() / 1024
+        results[f"points={target}"] = result
+    tracker.close()
+    return results
+
+
+def bench_control_panel(args):
+    tracker = make_tracker()
+    results = {}
+    for size in RESOLUTIONS:
+        img = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+        results[f"{size[0]}x{size[1]}"] = measure(lambda: tracker.draw_control_panel(img),
+                                                  args.iterations)
+    tracker.close()
+    return results
+
+
+def legacy_overlay(tracker, img, hands, texts):
+    """The per-line / per-circle landmarks and direct putText HUD the renderer replaced."""
+    for hand in hands:
+        pixels = hand.xy.astype(np.int32)
+        for a, b in HAND_CONNECTIONS:
+            color = tracker.custom_connections_style.get((a, b), (255, 255, 255))
+            cv2.line(img, tuple(pixels[a].tolist()), tuple(pixels[b].tolist()), color, 2, cv2.LINE_AA)
+        for x, y in pixels.tolist():
+            cv2.circle(img, (x, y), 6, (255, 255, 255), -1)
+            cv2.circle(img, (x, y), 4, (75, 75, 75), -1)
+    for text, org, scale, color, thickness in texts:
+        cv2.putText(img, text, org, cv2.FONT_HERSHEY_SIMPLEX, scale, color, thickness)
+
+
+def bench_overlay(args):
+    """Two hands plus main.py's HUD; the FPS / stage texts change like they do live.
+
+    'full' costs about the same as 'legacy' (the difference is within
+    run-to-run noise); only 'lite' and 'off' are measurably cheaper.
+    """
+    tracker = make_tracker()
+    rng = np.random.default_rng(4)
+    results = {}
+    for size in RESOLUTIONS:
+        shape = (size[1], size[0], 3)
+        frame = np.zeros(shape, dtype=np.uint8)
+        hands = synthetic_hands(tracker, 2, shape, rng)
+        counter = [0]
+
+        def hud():
+            counter[0] += 1
+            w, h = size
+            texts = [("Mode: MOUSE", (20, 50), 1, (0, 255, 0), 2),
+                     (f"FPS: {30 + counter[0] // 30 % 3}", (20, h - 20), 0.7, (255, 255, 255), 2)]
+            for i, name in enumerate(('capture', 'inference', 'render')):
+                texts.append((f"{name}: {counter[0] % 50 / 10:.1f} ms",
+                              (w - 260, h - 70 + 25 * i), 0.6, (255, 255, 255), 1))
+            return texts
+
+        results[f"{size[0]}x{size[1]}/legacy"] = measure(
+            lambda: legacy_overlay(tracker, frame, hands, hud()), args.iterations)
+        for level in OVERLAY_LEVELS:
+            renderer = OverlayRenderer(level)
+
+            def step():
+                tracker.overlay_level = level
+                tracker.draw_hands(frame, hands)
+                if renderer.enabled:
+                    for text in hud():
+                        renderer.text(*text)
+                renderer.composite(frame)
+
+            results[f"{size[0]}x{size[1]}/{level}"] = measure(step, args.iterations)
+    tracker.close()
+    return results
+
+
+BENCHMARKS = {
+    'find_hands': bench_find_hands,
+    'gesture': bench_gesture,
+    'smoothing': bench_smoothing,
+    'drawing': bench_drawing,
+    'control_panel': bench_control_panel,
+    'overlay': bench_overlay,
+}
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per tahap")
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help="Tahap yang diukur, dipisah koma")
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--video', help="Video untuk benchmark find_hands (default: frame noise)")
+    parser.add_argument('--output', help="Simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    report = {'environment': environment(), 'results': {}}
+    for stage in args.stages.split(','):
+        if stage not in BENCHMARKS:
+            parser.error(f"tahap tidak dikenal: {stage}")
+        print(f"== {stage}", file=sys.stderr)
+        report['results'][stage] = BENCHMARKS[stage](args)
+        for name, result in report['results'][stage].items():
+            print(f"   {name:<36} p50 {result['p50_ms']:8.3f} ms  p95 {result['p95_ms']:8.3f} ms  "
+                  f"p99 {result['p99_ms']:8.3f} ms  peak {result['peak_alloc_kb']:9.1f} KB",
+                  file=sys.stderr)
+
+    if resource is not None:
+        # ru_maxrss is KB on Linux, bytes on macOS
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        report['max_rss_mb'] = max_rss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# coordinates.py
+import time
+
+# Default active area in normalized camera coordinates: the old 50..590 x
+# 50..430 box of a 640x480 frame, now independent of the capture resolution
+DEFAULT_AREA = (50 / 640, 50 / 480, 590 / 640, 430 / 480)
+
+
+class ScreenMapper:
+    """Maps frame pixels to screen pixels through a normalized active area.
+
+    The active area is given in normalized camera coordinates (0..1), so it
+    covers the same part of the view at any capture resolution. The
+    per-axis scale and offset are computed once and cached until the frame
+    size, the active area or the screen size changes. The screen size is
+    re-read from the input backend every ``screen_poll_interval`` seconds,
+    so a display change is picked up without a restart.
+    """
+
+    def __init__(self, backend, area=DEFAULT_AREA, screen_poll_interval=2.0,
+                 area_tolerance=1e-3):
+        self.backend = backend
+        self.bounds = tuple(area)
+        self.area = tuple(area)
+        self.screen_poll_interval = screen_poll_interval
+        self.area_tolerance = area_tolerance
+        self.screen_size = tuple(backend.size())
+        self._screen_checked = time.perf_counter()
+        self._frame_size = None
+        self._transform = None
+
+    def invalidate(self):
+        self._transform = None
+
+    def set_area(self, x0, y0, x1, y1):
+        """Set the active area; changes below ``area_tolerance`` keep the cached transform."""
+        area = (x0, y0, x1, y1)
+        if max(abs(a - b) for a, b in zip(area, self.area)) > self.area_tolerance:
+            self.area = area
+            self.invalidate()
+
+    def check_screen(self):
+        # Wall clock, not frame timestamps: replayed traces carry their own clock
+        now = time.perf_counter()
+        if now - self._screen_checked < self.screen_poll_interval:
+            return
+        self._screen_checked = now
+        size = tuple(self.backend.size())
+        if size != self.screen_size:
+            self.screen_size = size
+            self.invalidate()
+
+    def transform(self, frame_shape):
+        """(scale_x, offset_x, scale_y, offset_y) from frame pixels to screen pixels."""
+        h, w = frame_shape[:2]
+        if self._transform is None or self._frame_size != (w, h):
+            x0, y0, x1, y1 = self.area
+            screen_w, screen_h = self.screen_size
+            scale_x = screen_w / max((x1 - x0) * w, 1e-6)
+            scale_y = screen_h / max((y1 - y0) * h, 1e-6)
+            self._transform = (scale_x, -x0 * w * scale_x, scale_y, -y0 * h * scale_y)
+            self._frame_size = (w, h)
+        return self._transform
+
+    def to_screen(self, x, y, frame_shape):
+        """Frame pixel -> screen pixel, clamped to the screen."""
+        scale_x, offset_x, scale_y, offset_y = self.transform(frame_shape)
+        screen_w, screen_h = self.screen_size
+        return (min(max(x * scale_x + offset_x, 0.0), screen_w),
+                min(max(y * scale_y + offset_y, 0.0), screen_h))
@@ -0,0 +1,108 @@
+# cursor_filter.py
+import math
+from collections import deque
+
+
+def smoothing_alpha(cutoff, dt):
+    """Exponential smoothing factor for a low-pass with ``cutoff`` Hz over ``dt`` seconds."""
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class CursorFilter:
+    """2D One Euro filter (Casiez et al.) with velocity prediction for cursor positions.
+
+    The cutoff frequency rises with speed: slow movements are smoothed hard
+    to remove jitter, fast ones pass through with little lag, and the output
+    is extrapolated ``prediction`` seconds along the filtered velocity to
+    hide what lag remains. State is O(1) per frame. Both axes share one
+    cutoff derived from the 2D speed, so diagonal motion is not filtered
+    differently from axis-aligned motion.
+    """
+
+    def __init__(self, min_cutoff=0.5, beta=0.01, d_cutoff=1.0, prediction=0.01):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.prediction = prediction
+        self.reset()
+
+    def reset(self):
+        self.pos = None
+        self.vel = (0.0, 0.0)
+        self.t = None
+
+    def filter(self, x, y, t):
+        if self.pos is None:
+            self.pos, self.t = (x, y), t
+            return x, y
+        dt = t - self.t
+        px, py = self.pos
+        vx, vy = self.vel
+        if dt > 0:
+            a_d = smoothing_alpha(self.d_cutoff, dt)
+            vx += a_d * ((x - px) / dt - vx)
+            vy += a_d * ((y - py) / dt - vy)
+            cutoff = self.min_cutoff + self.beta * math.hypot(vx, vy)
+            a = smoothing_alpha(cutoff, dt)
+            px += a * (x - px)
+            py += a * (y - py)
+            self.pos, self.vel, self.t = (px, py), (vx, vy), t
+        return px + vx * self.prediction, py + vy * self.prediction
+
+
+class LegacySmoother:
+    """The original speed clamp + exponential blend + weighted buffer + dead zone stack.
+
+    Kept for comparison with CursorFilter; it adds several frames of lag.
+    """
+
+    def __init__(self, smooth_factor=0.5, speed_limit=60, buffer_size=4, stability_threshold=15):
+        self.smooth_factor = smooth_factor
+        self.speed_limit = speed_limit
+        self.buffer_size = buffer_size
+        self.stability_threshold = stability_threshold
+        self.reset()
+
+    def reset(self):
+        self.prev_pos = (0, 0)
+        self.positions = deque(maxlen=self.buffer_size)
+        self.last_stable_pos = None
+        self._weights = {}
+
+    def _buffer_weights(self, n):
+        # Linear ramp 1..2 favouring recent positions, normalized
+        if n not in self._weights:
+            raw = [1.0 + (i / (n - 1) if n > 1 else 0.0) for i in range(n)]
+            total = sum(raw)
+            self._weights[n] = [w / total for w in raw]
+        return self._weights[n]
+
+    def buffer_smooth(self, new_pos):
+        self.positions.append(new_pos)
+        weights = self._buffer_weights(len(self.positions))
+        avg_x = int(sum(pos[0] * w for pos, w in zip(self.positions, weights)))
+        avg_y = int(sum(pos[1] * w for pos, w in zip(self.positions, weights)))
+
+        # Stability check
+        if self.last_stable_pos is not None:
+            dx = avg_x - self.last_stable_pos[0]
+            dy = avg_y - self.last_stable_pos[1]
+            if math.hypot(dx, dy) < self.stability_threshold:
+                return self.last_stable_pos
+
+        self.last_stable_pos = (avg_x, avg_y)
+        return (avg_x, avg_y)
+
+    def filter(self, x, y, t=None):
+        # Calculate movement with speed limit
+        dx = min(max(x - self.prev_pos[0], -self.speed_limit), self.speed_limit)
+        dy = min(max(y - self.prev_pos[1], -self.speed_limit), self.speed_limit)
+
+        # Apply smooth factor
+        curr_x = int(self.prev_pos[0] + dx * self.smooth_factor)
+        curr_y = int(self.prev_pos[1] + dy * self.smooth_factor)
+
+        curr_x, curr_y = self.buffer_smooth((curr_x, curr_y))
+        self.prev_pos = (curr_x, curr_y)
+        return curr_x, curr_y
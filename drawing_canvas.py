@@ -0,0 +1,240 @@
+# drawing_canvas.py
+import math
+from collections import deque
+
+import cv2
+import numpy as np
+
+
+def _wrap_angle(angle):
+    return (angle + math.pi) % (2 * math.pi) - math.pi
+
+
+def _narrow_cone(cone, angle, distance, tolerance):
+    """Intersect ``cone`` with the directions passing within ``tolerance`` of a point.
+
+    The point lies at ``angle`` and ``distance`` from the anchor. Returns
+    None when the intersection is empty.
+    """
+    half = math.asin(min(1.0, tolerance / distance))
+    if cone is None:
+        return angle, -half, half
+    reference, low, high = cone
+    offset = _wrap_angle(angle - reference)
+    low, high = max(low, offset - half), min(high, offset + half)
+    return (reference, low, high) if low <= high else None
+
+
+def _in_cone(cone, angle):
+    reference, low, high = cone
+    return low <= _wrap_angle(angle - reference) <= high
+
+
+class Stroke:
+    """One stroke as a compact int32 point array; color and thickness are stored once.
+
+    Points are simplified on-line: near-duplicates are dropped, and the last
+    point is replaced by the newer one as long as the segment from the last
+    kept point (the anchor) still passes within ``tolerance`` pixels of every
+    point replaced since. The replaced points are tracked as the cone of
+    directions from the anchor that stays within tolerance of all of them,
+    so the error cannot build up along a slow curve.
+    """
+
+    __slots__ = ('color', 'thickness', '_points', 'length', '_cone')
+
+    def __init__(self, color, thickness, capacity=32):
+        self.color = color
+        self.thickness = thickness
+        self._points = np.empty((capacity, 2), dtype=np.int32)
+        self.length = 0
+        # (reference angle, min offset, max offset) of the allowed directions
+        # from the anchor, or None when no point has been replaced yet
+        self._cone = None
+
+    def __len__(self):
+        return self.length
+
+    @property
+    def points(self):
+        return self._points[:self.length]
+
+    @property
+    def last(self):
+        return tuple(self._points[self.length - 1].tolist()) if self.length else None
+
+    @property
+    def nbytes(self):
+        return self._points.nbytes
+
+    def append(self, pt, min_distance=2.0, tolerance=1.5):
+        """Add ``pt``; returns False if it was dropped as a near-duplicate."""
+        if self.length:
+            last = self._points[self.length - 1]
+            if math.hypot(pt[0] - last[0], pt[1] - last[1]) < min_distance:
+                return False
+        if self.length >= 2:
+            ax, ay = self._points[self.length - 2]
+            bx, by = self._points[self.length - 1]
+            dx, dy = pt[0] - ax, pt[1] - ay
+            last_distance = math.hypot(bx - ax, by - ay)
+            # The new point must lead further from the anchor than the point it replaces
+            if math.hypot(dx, dy) >= last_distance > 0:
+                cone = _narrow_cone(self._cone, math.atan2(by - ay, bx - ax),
+                                    last_distance, tolerance)
+                if cone is not None and _in_cone(cone, math.atan2(dy, dx)):
+                    self._cone = cone
+                    self._points[self.length - 1] = pt
+                    return True
+        if self.length == len(self._points):
+            grown = np.empty((len(self._points) * 2, 2), dtype=np.int32)
+            grown[:self.length] = self._points[:self.length]
+            self._points = grown
+        self._points[self.length] = pt
+        self.length += 1
+        self._cone = None
+        return True
+
+    def compact(self):
+        """Trim unused capacity once the stroke is finished."""
+        if len(self._points) > self.length:
+            self._points = self._points[:max(self.length, 1)].copy()
+
+
+class DrawingCanvas:
+    """Persistent raster layer for air-drawing strokes.
+
+    New segments are drawn once onto ``layer`` (and ``mask``), and the layer
+    is composited onto each frame with a single masked copy, so frame cost
+    does not depend on how much has been drawn. Undo restores the pixels a
+    stroke covered from a checkpoint cropped to that stroke's bounding box.
+
+    Strokes flattened out of the vector history are kept in a separate base
+    layer, so redrawing from the remaining strokes does not lose them.
+    """
+
+    def __init__(self, max_checkpoints=20):
+        self.layer = None
+        self.mask = None
+        self.base_layer = None
+        self.base_mask = None
+        self.checkpoints = deque(maxlen=max_checkpoints)
+        self._snapshot = None
+        self._bounds = None
+
+    @property
+    def shape(self):
+        return None if self.layer is None else self.layer.shape
+
+    def ensure_size(self, shape):
+        """Allocate the layer for frames of ``shape``; returns True if it was (re)created."""
+        if self.layer is not None and self.layer.shape == shape:
+            return False
+        if self.base_layer is not None:
+            size = (shape[1], shape[0])
+            self.base_layer = cv2.resize(self.base_layer, size, interpolation=cv2.INTER_NEAREST)
+            self.base_mask = cv2.resize(self.base_mask, size, interpolation=cv2.INTER_NEAREST)
+        self.layer = np.zeros(shape, dtype=np.uint8)
+        self.mask = np.zeros(shape[:2], dtype=np.uint8)
+        self.checkpoints.clear()
+        self._snapshot = None
+        self._bounds = None
+        return True
+
+    def begin_stroke(self):
+        self._snapshot = (self.layer.copy(), self.mask.copy())
+        self._bounds = None
+
+    def add_segment(self, p0, p1, color, thickness):
+        cv2.line(self.layer, p0, p1, color, thickness)
+        cv2.line(self.mask, p0, p1, 255, thickness)
+
+        if self._snapshot is not None:
+            pad = thickness // 2 + 2
+            x0, x1 = min(p0[0], p1[0]) - pad, max(p0[0], p1[0]) + pad
+            y0, y1 = min(p0[1], p1[1]) - pad, max(p0[1], p1[1]) + pad
+            if self._bounds is not None:
+                x0, y0 = min(x0, self._bounds[0]), min(y0, self._bounds[1])
+                x1, y1 = max(x1, self._bounds[2]), max(y1, self._bounds[3])
+            self._bounds = (x0, y0, x1, y1)
+
+    def end_stroke(self):
+        """Keep only the part of the pre-stroke snapshot the stroke touched."""
+        if self._snapshot is None:
+            return
+        layer, mask = self._snapshot
+        self._snapshot = None
+        if self._bounds is None:
+            return
+        h, w = self.mask.shape
+        x0, y0, x1, y1 = self._bounds
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(w, x1 + 1), min(h, y1 + 1)
+        if x0 >= x1 or y0 >= y1:
+            return
+        self.checkpoints.append(((x0, y0, x1, y1),
+                                 layer[y0:y1, x0:x1].copy(),
+                                 mask[y0:y1, x0:x1].copy()))
+
+    def draw_stroke(self, stroke, layer=None, mask=None):
+        layer = self.layer if layer is None else layer
+        mask = self.mask if mask is None else mask
+        # Live drawing only rasterizes segments, so a lone point stays invisible here too
+        if len(stroke) > 1:
+            polyline = [stroke.points.reshape(-1, 1, 2)]
+            cv2.polylines(layer, polyline, False, stroke.color, stroke.thickness)
+            cv2.polylines(mask, polyline, False, 255, stroke.thickness)
+
+    def flatten(self, stroke):
+        """Burn ``stroke`` into the base layer so its vector data can be dropped."""
+        if self.base_layer is None:
+            self.base_layer = np.zeros_like(self.layer)
+            self.base_mask = np.zeros_like(self.mask)
+        self.draw_stroke(stroke, self.base_layer, self.base_mask)
+
+    def redraw(self, strokes):
+        """Rebuild the layer from the base layer plus ``strokes``."""
+        self.reset_layer()
+        for stroke in strokes:
+            self.draw_stroke(stroke)
+
+    def reset_layer(self):
+        if self.base_layer is not None:
+            np.copyto(self.layer, self.base_layer)
+            np.copyto(self.mask, self.base_mask)
+        else:
+            self.layer.fill(0)
+            self.mask.fill(0)
+
+    @property
+    def nbytes(self):
+        total = sum(a.nbytes for a in (self.layer, self.mask, self.base_layer, self.base_mask)
+                    if a is not None)
+        total += sum(layer.nbytes + mask.nbytes for _, layer, mask in self.checkpoints)
+        return total
+
+    def undo(self):
+        """Restore the region covered by the last stroke; returns False if nothing to undo."""
+        self.end_stroke()
+        if not self.checkpoints:
+            return False
+        (x0, y0, x1, y1), layer, mask = self.checkpoints.pop()
+        self.layer[y0:y1, x0:x1] = layer
+        self.mask[y0:y1, x0:x1] = mask
+        return True
+
+    def clear(self):
+        self.base_layer = None
+        self.base_mask = None
+        if self.layer is not None:
+            self.layer.fill(0)
+            self.mask.fill(0)
+        self.checkpoints.clear()
+        self._snapshot = None
+        self._bounds = None
+
+    def composite(self, img):
+        if self.layer is None or self.layer.shape != img.shape:
+            return img
+        cv2.copyTo(self.layer, self.mask, img)
+        return img
@@ -1,219 +1,354 @@
 from hand_tracker import ModernHandTracker
+from landmarks import as_points, point_xy
+from drawing_canvas import DrawingCanvas, Stroke
+from input_dispatcher import InputDispatcher, PyAutoGUIBackend
+from cursor_filter import CursorFilter, LegacySmoother
+from gesture_state import GestureTrigger, HysteresisThreshold
+from motion_gestures import MotionTracker
+from hand_identity import HandIdentityTracker
+from coordinates import ScreenMapper
 import cv2
 import numpy as np
-import pyautogui
 import math
 from typing import List, Dict, Tuple
 import time
 
 class EnhancedHandTracker(ModernHandTracker):
-    def __init__(self):
-        super().__init__()
-        # Screen & Mouse Configuration
-        self.screen_width, self.screen_height = pyautogui.size()
-        pyautogui.FAILSAFE = False
+    def __init__(self, input_backend=None, threaded_input=True, **tracker_kwargs):
+        super().__init__(**tracker_kwargs)
+        # OS input runs on its own worker so the frame loop never blocks on it.
+        # Backend, dispatcher and screen mapper are created on first use, so
+        # pyautogui (and its display query) only loads once mouse or media
+        # mode actually sends input.
+        self._input_backend = input_backend
+        self.threaded_input = threaded_input
+        self._input = None
+        
+        # Screen & Mouse Configuration: landmarks map to the screen through a
+        # normalized active area, so any capture resolution covers the same view
+        self._screen_mapper = None
         
         # Mouse Tracking Parameters
-        self.smooth_factor = 0.5
         self.prev_mouse_pos = (0, 0)
-        self.mouse_speed_limit = 60
         
-        # Expanded Detection Area for wider view
-        self.x_min, self.x_max = 50, 590
-        self.y_min, self.y_max = 50, 430
+        # Cursor filtering: adaptive One Euro filter with velocity prediction.
+        # use_legacy_smoothing switches back to the old clamp/blend/buffer stack.
+        self.legacy_smoother = LegacySmoother()
+        self.use_legacy_smoothing = False
+        
+        # Stable per-hand IDs and cursor/action roles. Every tracked hand gets
+        # its own cursor filter and gesture triggers (see new_hand_state);
+        # hands that were never identified share the default set below.
+        self.identity = HandIdentityTracker()
+        self.default_hand_state = self.new_hand_state()
+        self.cursor_filter = self.default_hand_state['cursor_filter']
+        self.pinch_threshold = self.default_hand_state['pinch_threshold']
+        self.click_trigger = self.default_hand_state['click_trigger']
+        self.media_keys = {
+            'play_pause': 'playpause',
+            'previous': 'prevtrack',
+            'next': 'nexttrack',
+            'volume_up': 'volumeup',
+            'volume_down': 'volumedown',
+        }
+        
+        # Active area follows the hand within the mapper bounds; margin is
+        # normalized (the old 100 px of a 640x480 frame)
+        self.mouse_area_margin = (100 / 640, 100 / 480)
         
         # Drawing Mode
         self.drawing_points = []
         self.is_drawing = False
         self.current_color = (0, 255, 0)
         self.current_thickness = 3
+        self.canvas = DrawingCanvas()
+        self._panel_sprite = None
         
-        # Mouse Stabilization
-        self.mouse_positions_buffer = []
-        self.buffer_size = 4
-        self.last_stable_pos = None
+        # Stroke compression: points closer than stroke_min_distance are
+        # dropped, runs that stay within stroke_tolerance pixels of one
+        # segment collapse into it (see Stroke.append), and
+        # once more than max_drawing_points are kept the oldest strokes are
+        # flattened into the canvas raster.
+        self.stroke_min_distance = 2.0
+        self.stroke_tolerance = 1.5
+        self.max_drawing_points = 20000
+        self.drawing_point_count = 0
+        self.flattened_strokes = 0
         
         # Mode Control
         self.modes = ['mouse', 'draw', 'media']
         self.current_mode_index = 0
-        
-        # Stability threshold
-        self.stability_threshold = 15
 
-    def calibrate_mouse_area(self, hand_points):
+    @staticmethod
+    def new_hand_state():
+        return {
+            'cursor_filter': CursorFilter(),
+            # Pinch click: hysteresis on the thumb-index distance in palm
+            # sizes (resolution independent), one click per pinch
+            'pinch_threshold': HysteresisThreshold(enter=0.3, exit=0.4),
+            'click_trigger': GestureTrigger(hold=0.05, cooldown=0.3, release=0.1),
+            # Media: swipes and rotations from the motion history fire once
+            # per motion; play/pause is a held Peace sign
+            'motion': MotionTracker(),
+            'play_pause_trigger': GestureTrigger(hold=0.2, cooldown=1.0, release=0.2),
+        }
+
+    def identify_hands(self, hands, frame_shape, timestamp=None):
+        """Give this frame's hands stable ``hand_id``s and cursor/action roles."""
+        now = time.perf_counter() if timestamp is None else timestamp
+        return self.identity.update(hands, frame_shape, now)
+
+    def hand_state(self, hand_points):
+        """Cursor filter and gesture triggers belonging to this hand."""
+        state = self.identity.state_for(hand_points)
+        if state is None:
+            return self.default_hand_state
+        if not state:
+            state.update(self.new_hand_state())
+        return state
+
+    @property
+    def input_backend(self):
+        if self._input_backend is None:
+            self._input_backend = PyAutoGUIBackend()
+        return self._input_backend
+
+    @property
+    def input(self):
+        if self._input is None:
+            self._input = InputDispatcher(self.input_backend, threaded=self.threaded_input).start()
+        return self._input
+
+    @property
+    def input_active(self):
+        """True once the input dispatcher has been created."""
+        return self._input is not None
+
+    @property
+    def screen_mapper(self):
+        if self._screen_mapper is None:
+            self._screen_mapper = ScreenMapper(self.input_backend)
+        return self._screen_mapper
+
+    @property
+    def screen_width(self):
+        return self.screen_mapper.screen_size[0]
+
+    @property
+    def screen_height(self):
+        return self.screen_mapper.screen_size[1]
+
+    def calibrate_mouse_area(self, hand_points, frame_shape):
         if not hand_points:
             return
         
-        x_values = [point['x'] for point in hand_points]
-        y_values = [point['y'] for point in hand_points]
+        h, w = frame_shape[:2]
+        hand_x_min, hand_y_min, hand_x_max, hand_y_max = self.hand_bounds(hand_points)
         
-        # Wider area calibration with smoothing
-        margin = 100
-        target_x_min = max(50, min(x_values) - margin)
-        target_x_max = min(590, max(x_values) + margin)
-        target_y_min = max(50, min(y_values) - margin)
-        target_y_max = min(430, max(y_values) + margin)
+        # Wider area calibration with smoothing, in normalized coordinates
+        margin_x, margin_y = self.mouse_area_margin
+        bound_x0, bound_y0, bound_x1, bound_y1 = self.screen_mapper.bounds
+        target = (max(bound_x0, hand_x_min / w - margin_x),
+                  max(bound_y0, hand_y_min / h - margin_y),
+                  min(bound_x1, hand_x_max / w + margin_x),
+                  min(bound_y1, hand_y_max / h + margin_y))
         
         # Smooth transition for area boundaries
-        self.x_min = int(self.x_min * 0.8 + target_x_min * 0.2)
-        self.x_max = int(self.x_max * 0.8 + target_x_max * 0.2)
-        self.y_min = int(self.y_min * 0.8 + target_y_min * 0.2)
-        self.y_max = int(self.y_max * 0.8 + target_y_max * 0.2)
+        area = self.screen_mapper.area
+        self.screen_mapper.set_area(*(a * 0.8 + t * 0.2 for a, t in zip(area, target)))
 
     def air_drawing(self, hand_points, img):
         if not hand_points:
             return img
             
-        index_tip = hand_points[8]
-        middle_tip = hand_points[12]
-        
-        if self.check_drawing_mode(hand_points):
-            pt = (index_tip['x'], index_tip['y'])
-            if not self.is_drawing:
-                self.drawing_points.append([])
-                self.is_drawing = True
-            self.drawing_points[-1].append((pt, self.current_color, self.current_thickness))
-        else:
-            self.is_drawing = False
+        points = as_points(hand_points)
+        
+        if self.canvas.ensure_size(img.shape):
+            self.redraw_canvas()
+        
+        if self.check_drawing_mode(points):
+            pt = (int(points[8, 0]), int(points[8, 1]))
+            stroke = self.drawing_points[-1] if self.is_drawing else None
+            if (stroke is None or stroke.color != self.current_color
+                    or stroke.thickness != self.current_thickness):
+                self.start_stroke()
+                stroke = self.drawing_points[-1]
+            prev = stroke.last
+            old_length = len(stroke)
+            if stroke.append(pt, self.stroke_min_distance, self.stroke_tolerance):
+                if prev is not None:
+                    self.canvas.add_segment(prev, pt, stroke.color, stroke.thickness)
+                self.drawing_point_count += len(stroke) - old_length
+                self.enforce_drawing_budget()
+        elif self.is_drawing:
+            self.finish_stroke()
             
-        for stroke in self.drawing_points:
-            for i in range(1, len(stroke)):
-                cv2.line(img, stroke[i-1][0], stroke[i][0], 
-                        stroke[i][1], stroke[i][2])
-                        
-        return img
+        return self.canvas.composite(img)
+
+    def start_stroke(self):
+        if self.is_drawing:
+            self.finish_stroke()
+        self.drawing_points.append(Stroke(self.current_color, self.current_thickness))
+        self.canvas.begin_stroke()
+        self.is_drawing = True
+
+    def finish_stroke(self):
+        self.canvas.end_stroke()
+        if self.drawing_points:
+            stroke = self.drawing_points[-1]
+            if len(stroke) < 2:
+                # A single point draws no segment, so the canvas kept no undo
+                # checkpoint for it; drop it to keep strokes and checkpoints paired
+                self.drawing_points.pop()
+                self.drawing_point_count -= len(stroke)
+            else:
+                stroke.compact()
+        self.is_drawing = False
+
+    def enforce_drawing_budget(self):
+        # Keep at least the stroke in progress as vector data
+        while self.drawing_point_count > self.max_drawing_points and len(self.drawing_points) > 1:
+            stroke = self.drawing_points.pop(0)
+            self.canvas.flatten(stroke)
+            self.drawing_point_count -= len(stroke)
+            self.flattened_strokes += 1
+
+    def redraw_canvas(self):
+        # Only needed when the frame size changes; normal frames draw new segments only
+        self.canvas.redraw(self.drawing_points)
+
+    def undo_stroke(self):
+        if self.is_drawing:
+            self.finish_stroke()
+        if not self.drawing_points:
+            return
+        stroke = self.drawing_points.pop()
+        self.drawing_point_count -= len(stroke)
+        if not self.canvas.undo():
+            # Older than the kept checkpoints: rebuild from the remaining strokes
+            self.redraw_canvas()
 
-    def media_controls(self, hand_points):
+    def clear_drawing(self):
+        self.drawing_points = []
+        self.drawing_point_count = 0
+        self.is_drawing = False
+        self.canvas.clear()
+
+    def drawing_memory(self):
+        """Bytes held by the drawing state (vector strokes plus raster layers)."""
+        return sum(stroke.nbytes for stroke in self.drawing_points) + self.canvas.nbytes
+
+    def media_controls(self, hand_points, timestamp=None):
+        """Return the media action fired this frame ("none" most frames) and send its key."""
         if not hand_points:
             return "none"
-            
+        now = time.perf_counter() if timestamp is None else timestamp
+        hand_state = self.hand_state(hand_points)
+        event = hand_state['motion'].update(hand_points, now)
         gesture = self.get_gesture(hand_points)
         
-        if gesture == "Peace":
-            return "play_pause"
-        elif gesture == "Open Palm":
-            palm_center = hand_points[0]
-            if palm_center['x'] < 200:
-                return "previous"
-            elif palm_center['x'] > 440:
-                return "next"
-                
-        thumb_tip = hand_points[4]
-        index_tip = hand_points[8]
-        angle = math.atan2(index_tip['y'] - thumb_tip['y'], 
-                          index_tip['x'] - thumb_tip['x'])
-        angle = math.degrees(angle)
-        
-        if 45 < angle < 135:
-            return "volume_up"
-        elif -135 < angle < -45:
-            return "volume_down"
-            
-        return "none"
+        if hand_state['play_pause_trigger'].update(gesture == "Peace", now):
+            action = 'play_pause'
+        elif event in ('swipe_left', 'swipe_right') and gesture == "Open Palm":
+            action = 'previous' if event == 'swipe_left' else 'next'
+        elif event in ('rotate_cw', 'rotate_ccw'):
+            action = 'volume_up' if event == 'rotate_cw' else 'volume_down'
+        else:
+            return "none"
+        self.input.press(self.media_keys[action])
+        return action
 
     def draw_control_panel(self, img):
-        h, w, c = img.shape
-        
-        cv2.rectangle(img, (w-200, 0), (w, 150), (0, 0, 0), -1)
-        cv2.rectangle(img, (w-200, 0), (w, 150), (255, 255, 255), 1)
+        # The panel only changes with the selected color / thickness, so it
+        # is rendered once per selection and copied into the frame
+        key = (self.current_color, self.current_thickness)
+        if self._panel_sprite is None or self._panel_sprite[0] != key:
+            self._panel_sprite = (key, self.render_control_panel())
+        panel = self._panel_sprite[1]
+        h, w = img.shape[:2]
+        ph, pw = min(panel.shape[0], h), min(panel.shape[1], w)
+        img[:ph, w - pw:] = panel[:ph, panel.shape[1] - pw:]
+        return img
+
+    def render_control_panel(self):
+        # 151 rows: the old filled rectangle included its bottom edge at y=150
+        panel = np.zeros((151, 200, 3), dtype=np.uint8)
+        cv2.rectangle(panel, (0, 0), (200, 150), (255, 255, 255), 1)
         
         colors = [(0, 255, 0), (255, 0, 0), (0, 0, 255), (255, 255, 0)]
         for i, color in enumerate(colors):
-            cv2.circle(img, (w-180+i*40, 30), 15, color, -1)
+            cv2.circle(panel, (20+i*40, 30), 15, color, -1)
             if color == self.current_color:
-                cv2.circle(img, (w-180+i*40, 30), 17, (255, 255, 255), 2)
+                cv2.circle(panel, (20+i*40, 30), 17, (255, 255, 255), 2)
                 
         for i in range(3):
             thickness = i*2 + 2
             y_pos = 70 + i*20
-            cv2.line(img, (w-180, y_pos), (w-100, y_pos), 
+            cv2.line(panel, (20, y_pos), (100, y_pos), 
                     (255, 255, 255), thickness)
             if thickness == self.current_thickness:
-                cv2.circle(img, (w-190, y_pos), 5, (0, 255, 0), -1)
+                cv2.circle(panel, (10, y_pos), 5, (0, 255, 0), -1)
                 
-        return img
+        return panel
 
     def check_drawing_mode(self, hand_points):
-        index_up = hand_points[8]['y'] < hand_points[7]['y']
-        middle_down = hand_points[12]['y'] > hand_points[11]['y']
-        return index_up and middle_down
+        points = as_points(hand_points)
+        index_up = points[8, 1] < points[7, 1]
+        middle_down = points[12, 1] > points[11, 1]
+        return bool(index_up and middle_down)
 
     def advanced_mouse_smoothing(self, new_pos):
-        self.mouse_positions_buffer.append(new_pos)
-        
-        if len(self.mouse_positions_buffer) > self.buffer_size:
-            self.mouse_positions_buffer.pop(0)
-        
-        # Weighted average with more weight to recent positions
-        weights = np.linspace(1, 2, len(self.mouse_positions_buffer))
-        weights = weights / np.sum(weights)
-        
-        avg_x = int(sum(pos[0] * w for pos, w in zip(self.mouse_positions_buffer, weights)))
-        avg_y = int(sum(pos[1] * w for pos, w in zip(self.mouse_positions_buffer, weights)))
-        
-        # Stability check
-        if self.last_stable_pos is not None:
-            dx = avg_x - self.last_stable_pos[0]
-            dy = avg_y - self.last_stable_pos[1]
-            distance = math.sqrt(dx*dx + dy*dy)
-            
-            if distance < self.stability_threshold:
-                return self.last_stable_pos
-            
-        self.last_stable_pos = (avg_x, avg_y)
-        return (avg_x, avg_y)
+        return self.legacy_smoother.buffer_smooth(new_pos)
 
-    def virtual_mouse(self, hand_points, img):
+    def virtual_mouse(self, hand_points, img, timestamp=None):
         if not hand_points:
             return img, False
         
-        self.calibrate_mouse_area(hand_points)
+        now = time.perf_counter() if timestamp is None else timestamp
+        self.screen_mapper.check_screen()
+        self.calibrate_mouse_area(hand_points, img.shape)
         
-        index_tip = hand_points[8]
-        thumb_tip = hand_points[4]
+        points = as_points(hand_points)
+        index_tip = points[8]
+        thumb_tip = points[4]
         
-        # Smoother interpolation
-        screen_x = np.interp(index_tip['x'], 
-                           [self.x_min, self.x_max], 
-                           [0, self.screen_width])
-        screen_y = np.interp(index_tip['y'], 
-                           [self.y_min, self.y_max], 
-                           [0, self.screen_height])
+        # Frame pixels -> screen pixels through the cached transform
+        screen_x, screen_y = self.screen_mapper.to_screen(index_tip[0], index_tip[1], img.shape)
         
-        # Calculate movement with speed limit
-        dx = screen_x - self.prev_mouse_pos[0]
-        dy = screen_y - self.prev_mouse_pos[1]
-        
-        # Apply speed limits
-        dx = np.clip(dx, -self.mouse_speed_limit, self.mouse_speed_limit)
-        dy = np.clip(dy, -self.mouse_speed_limit, self.mouse_speed_limit)
-        
-        # Apply smooth factor
-        curr_mouse_x = int(self.prev_mouse_pos[0] + dx * self.smooth_factor)
-        curr_mouse_y = int(self.prev_mouse_pos[1] + dy * self.smooth_factor)
-        
-        # Apply advanced smoothing
-        curr_mouse_x, curr_mouse_y = self.advanced_mouse_smoothing((curr_mouse_x, curr_mouse_y))
+        hand_state = self.hand_state(hand_points)
+        if self.use_legacy_smoothing:
+            curr_mouse_x, curr_mouse_y = self.legacy_smoother.filter(screen_x, screen_y)
+        else:
+            filtered_x, filtered_y = hand_state['cursor_filter'].filter(screen_x, screen_y, now)
+            curr_mouse_x = int(np.clip(filtered_x, 0, self.screen_width - 1))
+            curr_mouse_y = int(np.clip(filtered_y, 0, self.screen_height - 1))
         
-        is_clicking = self.check_pinch(thumb_tip, index_tip)
+        palm_size = math.hypot(points[9, 0] - points[0, 0], points[9, 1] - points[0, 1]) or 1.0
+        pinch_distance = math.hypot(thumb_tip[0] - index_tip[0], thumb_tip[1] - index_tip[1])
+        is_clicking = hand_state['pinch_threshold'].update(pinch_distance / palm_size)
         
-        try:
-            if not is_clicking:  # Only move if not clicking
-                pyautogui.moveTo(curr_mouse_x, curr_mouse_y, duration=0.01)
-            else:
-                pyautogui.click()
-        except Exception as e:
-            print(f"Mouse movement error: {e}")
+        if not is_clicking:  # Only move if not clicking
+            self.input.move_to(curr_mouse_x, curr_mouse_y)
+        if hand_state['click_trigger'].update(is_clicking, now):
+            self.input.click()
         
         self.prev_mouse_pos = (curr_mouse_x, curr_mouse_y)
         
         # Visual feedback
-        cv2.circle(img, (index_tip['x'], index_tip['y']), 10, (255, 0, 255), cv2.FILLED)
+        index_px = (int(index_tip[0]), int(index_tip[1]))
+        cv2.circle(img, index_px, 10, (255, 0, 255), cv2.FILLED)
         if is_clicking:
-            cv2.circle(img, (index_tip['x'], index_tip['y']), 12, (0, 255, 0), 2)
+            cv2.circle(img, index_px, 12, (0, 255, 0), 2)
         
         return img, is_clicking
 
     def check_pinch(self, p1, p2, threshold=30):
-        distance = math.hypot(p1['x'] - p2['x'], p1['y'] - p2['y'])
-        return distance < threshold
\ No newline at end of file
+        x1, y1 = point_xy(p1)
+        x2, y2 = point_xy(p2)
+        distance = math.hypot(x1 - x2, y1 - y2)
+        return distance < threshold
+
+    def close(self):
+        if self._input is not None:
+            self._input.stop()
+        super().close()
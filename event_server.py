@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Stream landmarks and gesture events to other programs over a local socket.
+
+main.py --headless --serve ADDRESS publishes one JSON line per message to
+every connected client (ADDRESS is ``unix:/tmp/hand.sock``,
+``tcp:127.0.0.1:8765`` or just a port):
+
+    {"type": "hello", "version": 1, "mode": "mouse"}
+    {"type": "frame", "frame": 812, "t": 1523.204, "size": [1920, 1080], "mode": "mouse",
+     "hands": [{"id": 3, "role": "cursor", "handedness": "Right", "score": 0.97,
+                "gesture": "Pointing", "landmarks": [[0.5123, 0.4410, -0.0312], ...]}]}
+    {"type": "gesture", "t": 1523.204, "hand": 3, "gesture": "Fist"}
+    {"type": "hand_lost", "t": 1523.900, "hand": 3}
+    {"type": "mode", "t": 1524.010, "mode": "media"}
+    {"type": "action", "t": 1524.300, "action": "play_pause"}
+
+Landmarks are normalized to the frame (0..1). ``t`` is the capture time in
+seconds on the tracker's monotonic clock. Gesture events are debounced: a
+gesture is reported once it has been stable for ``gesture_debounce``
+seconds. Events are never dropped. A client that falls behind loses its
+oldest queued frame messages, so it always catches up to the newest frame.
+A client whose event queue overflows is disconnected.
+
+    python event_server.py unix:/tmp/hand.sock          # print messages
+    python event_server.py tcp:127.0.0.1:8765 --stats   # message rate only
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+PROTOCOL_VERSION = 1
+
+
+def parse_address(address):
+    """'unix:/path', 'tcp:host:port', 'host:port' or 'port' -> ('unix', path) / ('tcp', (host, port))."""
+    if address.startswith('unix:'):
+        return 'unix', address[5:]
+    if address.startswith('tcp:'):
+        address = address[4:]
+    host, _, port = address.rpartition(':')
+    return 'tcp', (host or '127.0.0.1', int(port))
+
+
+class _Client:
+    """Per-connection queues: frames are latest-wins, events are kept in order."""
+
+    def __init__(self, writer, max_frames, max_events):
+        self.writer = writer
+        self.frames = deque(maxlen=max_frames)
+        self.events = deque()
+        self.max_events = max_events
+        self.ready = asyncio.Event()
+        self.sent = 0
+        self.dropped = 0
+        self.overflowed = False
+
+    def push(self, data, is_event):
+        if is_event:
+            if len(self.events) >= self.max_events:
+                self.overflowed = True
+            else:
+                self.events.append(data)
+        else:
+            if len(self.frames) == self.frames.maxlen:
+                self.dropped += 1
+            self.frames.append(data)
+        self.ready.set()
+
+    def pop(self):
+        if self.events:
+            return self.events.popleft()
+        if self.frames:
+            return self.frames.popleft()
+        return None
+
+
+async def _discard_until_eof(reader):
+    # Clients only listen; anything they send is read and thrown away
+    while await reader.read(4096):
+        pass
+
+
+class EventServer:
+    """asyncio socket server on its own thread, fed from the (synchronous) frame loop.
+
+    ``publish_frame`` and ``publish_event`` encode a message once and hand
+    it to the event loop with call_soon_threadsafe, so the frame loop never
+    waits on a client. Each client has a writer task that drains its queues
+    and awaits ``drain()`` once the transport buffer passes
+    ``write_buffer_limit``. A slow consumer therefore backs up into its own
+    bounded frame queue, where the oldest frames are dropped, and never
+    into the tracker or into the other clients.
+    """
+
+    def __init__(self, address, max_frames=8, max_events=1024, write_buffer_limit=32 * 1024,
+                 gesture_debounce=0.15, precision=4):
+        self.kind, self.address = parse_address(address)
+        self.max_frames = max_frames
+        self.max_events = max_events
+        self.write_buffer_limit = write_buffer_limit
+        self.gesture_debounce = gesture_debounce
+        self.precision = precision
+        self.mode = None
+        self.frames_published = 0
+        self.events_published = 0
+        self.clients_served = 0
+        self.dropped = 0
+        self.disconnected_slow = 0
+
+        self._clients = set()
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+        # hand id -> [reported gesture, candidate gesture, candidate since]
+        self._gestures = {}
+
+    # -- server thread -------------------------------------------------
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="event-server", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+        return self
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._open())
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+            self._loop.close()
+            return
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.run_until_complete(self._close())
+            self._loop.close()
+
+    async def _open(self):
+        if self.kind == 'unix':
+            # A socket file left behind by a previous run would block bind()
+            if os.path.exists(self.address):
+                os.unlink(self.address)
+            self._server = await asyncio.start_unix_server(self._serve_client, path=self.address)
+        else:
+            host, port = self.address
+            self._server = await asyncio.start_server(self._serve_client, host, port)
+            if port == 0:
+                self.address = self._server.sockets[0].getsockname()[:2]
+
+    async def _close(self):
+        self._server.close()
+        for client in list(self._clients):
+            client.writer.close()
+        await self._server.wait_closed()
+        tasks = [task for task in asyncio.all_tasks(self._loop)
+                 if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.kind == 'unix' and os.path.exists(self.address):
+            os.unlink(self.address)
+
+    def stop(self):
+        if self._loop is None or self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=2.0)
+        self._thread = None
+
+    async def _serve_client(self, reader, writer):
+        client = _Client(writer, self.max_frames, self.max_events)
+        self._clients.add(client)
+        self.clients_served += 1
+        sock = writer.get_extra_info('socket')
+        if sock is not None and sock.family in (socket.AF_INET, socket.AF_INET6):
+            # Small messages at frame rate: do not wait to coalesce them
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        closed = asyncio.ensure_future(_discard_until_eof(reader))
+        try:
+            client.push(self._encode({'type': 'hello', 'version': PROTOCOL_VERSION,
+                                      'mode': self.mode}), True)
+            while not closed.done():
+                if client.overflowed:
+                    self.disconnected_slow += 1
+                    break
+                data = client.pop()
+                if data is None:
+                    client.ready.clear()
+                    waiter = asyncio.ensure_future(client.ready.wait())
+                    await asyncio.wait((waiter, closed), return_when=asyncio.FIRST_COMPLETED)
+                    waiter.cancel()
+                    continue
+                writer.write(data)
+                client.sent += 1
+                if writer.transport.get_write_buffer_size() > self.write_buffer_limit:
+                    await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            closed.cancel()
+            self._clients.discard(client)
+            self.dropped += client.dropped
+            writer.close()
+
+    def _broadcast(self, data, is_event):
+        for client in self._clients:
+            client.push(data, is_event)
+
+    # -- frame loop side ------------------------------------------------
+
+    @staticmethod
+    def _encode(message):
+        return (json.dumps(message, separators=(',', ':')) + '\n').encode()
+
+    def _publish(self, message, is_event):
+        if self._loop is None or not self._ready.is_set():
+            return
+        self._loop.call_soon_threadsafe(self._broadcast, self._encode(message), is_event)
+
+    def publish_event(self, kind, timestamp, **fields):
+        self.events_published += 1
+        self._publish({'type': kind, 't': round(timestamp, 4), **fields}, True)
+
+    def publish_frame(self, frame_id, timestamp, hands, frame_shape, mode, gestures=()):
+        """Publish one frame's landmarks and any gesture changes it completes.
+
+        ``gestures`` holds one label per hand, in the order of ``hands``.
+        """
+        self.mode = mode
+        h, w = frame_shape[:2]
+        entries = []
+        if len(hands):
+            points = np.round(hands.array / np.array([w, h, 1.0], dtype=np.float32),
+                              self.precision).tolist()
+            for hand, landmarks, gesture in zip(hands, points, gestures):
+                entries.append({'id': hand.hand_id, 'role': hand.role,
+                                'handedness': hand.handedness, 'score': round(float(hand.score), 3),
+                                'gesture': gesture, 'landmarks': landmarks})
+        self.frames_published += 1
+        self._publish({'type': 'frame', 'frame': frame_id, 't': round(timestamp, 4),
+                       'size': [w, h], 'mode': mode, 'hands': entries}, False)
+        self._debounce_gestures(hands, gestures, timestamp)
+
+    def _debounce_gestures(self, hands, gestures, now):
+        seen = set()
+        for hand, gesture in zip(hands, gestures):
+            seen.add(hand.hand_id)
+            state = self._gestures.get(hand.hand_id)
+            if state is None:
+                state = self._gestures[hand.hand_id] = [None, gesture, now]
+            if gesture != state[1]:
+                state[1], state[2] = gesture, now
+            elif gesture != state[0] and now - state[2] >= self.gesture_debounce:
+                state[0] = gesture
+                self.publish_event('gesture', now, hand=hand.hand_id, gesture=gesture)
+        for hand_id in list(self._gestures):
+            if hand_id not in seen:
+                del self._gestures[hand_id]
+                self.publish_event('hand_lost', now, hand=hand_id)
+
+    def stats(self):
+        clients = list(self._clients)
+        return {
+            'frames': self.frames_published,
+            'events': self.events_published,
+            'clients': len(clients),
+            'clients_served': self.clients_served,
+            'dropped_frames': self.dropped + sum(client.dropped for client in clients),
+            'disconnected_slow': self.disconnected_slow,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Klien sederhana untuk main.py --serve")
+    parser.add_argument('address', help="unix:/path/socket, tcp:host:port, atau port")
+    parser.add_argument('--stats', action='store_true',
+                        help="Tampilkan jumlah pesan per detik, bukan isi pesan")
+    args = parser.parse_args()
+
+    kind, address = parse_address(args.address)
+    sock = socket.socket(socket.AF_UNIX if kind == 'unix' else socket.AF_INET, socket.SOCK_STREAM)
+    sock.connect(address)
+    counts = {}
+    last = time.perf_counter()
+    try:
+        for line in sock.makefile('rb'):
+            if not args.stats:
+                print(line.decode().rstrip())
+                continue
+            kind = json.loads(line)['type']
+            counts[kind] = counts.get(kind, 0) + 1
+            now = time.perf_counter()
+            if now - last >= 1.0:
+                print("  ".join(f"{name} {count / (now - last):.1f}/s"
+                                for name, count in sorted(counts.items())))
+                counts, last = {}, now
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sock.close()
+
+
+if __name__ == "__main__":
+    main()
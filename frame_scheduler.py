@@ -0,0 +1,104 @@
+# frame_scheduler.py
+import time
+
+
+class StateUsage:
+    """Frames, wall time and process CPU time accumulated while in one scheduler state."""
+
+    __slots__ = ('frames', 'wall', 'cpu')
+
+    def __init__(self):
+        self.frames = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+
+    def summary(self):
+        return {
+            'frames': self.frames,
+            'seconds': self.wall,
+            'fps': self.frames / self.wall if self.wall > 0 else 0.0,
+            'cpu_percent': 100.0 * self.cpu / self.wall if self.wall > 0 else 0.0,
+        }
+
+
+class AdaptiveScheduler:
+    """Drops to a low-rate, low-resolution presence check while no hand is in view.
+
+    In ``active`` every frame is processed (capped at ``active_fps`` if set)
+    at the tracker's normal inference width. After ``idle_after`` seconds
+    without a hand it switches to ``idle``: at most ``idle_fps`` frames per
+    second, detected at ``idle_width``. The first frame that finds a hand
+    switches straight back, so the next frame already runs at full rate and
+    resolution.
+
+    Callers call wait() before grabbing a frame and update() after detection.
+    Wall time, process CPU time and frame counts are kept per state.
+    """
+
+    ACTIVE, IDLE = 'active', 'idle'
+
+    def __init__(self, tracker, idle_after=2.0, idle_fps=5.0, idle_width=256, active_fps=None):
+        self.tracker = tracker
+        self.idle_after = idle_after
+        self.idle_fps = idle_fps
+        self.idle_width = idle_width
+        self.active_fps = active_fps
+        self.active_width = tracker.inference_width
+
+        self.state = self.ACTIVE
+        self.transitions = 0
+        self.last_hand_at = None
+        self.next_frame_at = 0.0
+        self.usage = {self.ACTIVE: StateUsage(), self.IDLE: StateUsage()}
+        self._wall_mark = time.perf_counter()
+        self._cpu_mark = time.process_time()
+
+    @property
+    def idle(self):
+        return self.state == self.IDLE
+
+    @property
+    def frame_interval(self):
+        fps = self.idle_fps if self.idle else self.active_fps
+        return 1.0 / fps if fps else 0.0
+
+    def wait(self):
+        """Sleep until the next frame is due in the current state."""
+        delay = self.next_frame_at - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    def update(self, hands_found, timestamp=None):
+        """Record one processed frame and switch state if needed; returns the state."""
+        now = time.perf_counter() if timestamp is None else timestamp
+        self._account()
+        self.usage[self.state].frames += 1
+
+        if hands_found:
+            self.last_hand_at = now
+            if self.idle:
+                self._enter(self.ACTIVE)
+        elif not self.idle:
+            if self.last_hand_at is None:
+                self.last_hand_at = now
+            if now - self.last_hand_at >= self.idle_after:
+                self._enter(self.IDLE)
+
+        self.next_frame_at = now + self.frame_interval
+        return self.state
+
+    def _account(self):
+        wall, cpu = time.perf_counter(), time.process_time()
+        usage = self.usage[self.state]
+        usage.wall += wall - self._wall_mark
+        usage.cpu += cpu - self._cpu_mark
+        self._wall_mark, self._cpu_mark = wall, cpu
+
+    def _enter(self, state):
+        self.state = state
+        self.transitions += 1
+        self.tracker.inference_width = self.idle_width if state == self.IDLE else self.active_width
+
+    def report(self):
+        self._account()
+        return {state: usage.summary() for state, usage in self.usage.items()}
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Pluggable gesture classifiers.
+
+A classifier has ``classify(points, features=None, handedness=None)`` taking
+(N, 21, 3) landmarks (plus the HandFeatures already computed for them, and
+per-hand handedness labels) and returning (labels, confidences) for all N
+hands at once. ModernHandTracker.gesture_classifier can be any such object.
+
+RuleClassifier is the built-in threshold rules. TemplateClassifier matches
+normalized landmarks against user-recorded templates, so a new gesture is
+added by recording it, not by writing rules:
+
+    python gesture_classifier.py add templates.npz Pinch pinch.hgt
+    python gesture_classifier.py list templates.npz
+    python main.py --gesture-templates templates.npz
+"""
+
+import argparse
+
+import numpy as np
+
+from gesture_features import classify_features, compute_features
+from landmarks import NUM_LANDMARKS
+
+FEATURE_DIM = (NUM_LANDMARKS - 1) * 2
+UNKNOWN = "Unknown"
+
+
+def normalize_landmarks(points, handedness=None, mirror_left=True):
+    """Translation/scale/rotation-invariant (N, 40) feature vectors.
+
+    The wrist is moved to the origin, the hand is rotated so the wrist ->
+    middle finger base axis points up, and everything is scaled by that
+    axis length. Left hands are mirrored so one template set serves both.
+    """
+    xy = np.asarray(points, dtype=np.float32)[..., :2]
+    if xy.ndim == 2:
+        xy = xy[np.newaxis]
+    centered = xy[:, 1:] - xy[:, :1]
+    ux, uy = centered[:, 8, 0], centered[:, 8, 1]
+    scale2 = np.maximum(ux * ux + uy * uy, 1e-12)
+    # Rotation taking the wrist -> middle base axis to (0, -1), divided by its length
+    rotation = np.empty((len(xy), 2, 2), dtype=np.float32)
+    rotation[:, 0, 0] = -uy / scale2
+    rotation[:, 0, 1] = -ux / scale2
+    rotation[:, 1, 0] = ux / scale2
+    rotation[:, 1, 1] = -uy / scale2
+    out = centered @ rotation
+    if mirror_left and handedness is not None:
+        left = np.array([label == 'Left' for label in handedness], dtype=bool)
+        out[left, :, 0] *= -1
+    return out.reshape(len(xy), FEATURE_DIM)
+
+
+class RuleClassifier:
+    """The threshold rules from gesture_features; confidence is 1 on a match, 0 for Unknown."""
+
+    def classify(self, points, features=None, handedness=None):
+        if features is None:
+            features = compute_features(points)
+        labels = classify_features(features)
+        return labels, np.array([label != UNKNOWN for label in labels], dtype=np.float32)
+
+
+class TemplateClassifier:
+    """k-nearest-neighbour matching against recorded gesture templates.
+
+    Templates are stored as one (M, 40) float32 matrix with precomputed
+    squared norms, so a frame's hands are matched with a single matrix
+    product and an argpartition. Each of the k nearest templates votes with
+    a Gaussian weight of its distance; sigma is calibrated from the typical
+    distance between a template and its nearest same-label neighbour. The
+    confidence is the winning label's share of the votes, where a constant
+    "reject" weight (a template ``reject_sigmas`` away) competes too, so a
+    pose far from every template scores near zero instead of picking the
+    least bad label. Below ``min_confidence`` the label is ``fallback``'s
+    answer, or Unknown without a fallback.
+    """
+
+    def __init__(self, k=5, reject_sigmas=3.0, min_confidence=0.5, mirror_left=True,
+                 fallback=None):
+        self.k = k
+        self.reject_sigmas = reject_sigmas
+        self.min_confidence = min_confidence
+        self.mirror_left = mirror_left
+        self.fallback = fallback
+        self.classes = []
+        self.features = np.empty((0, FEATURE_DIM), dtype=np.float32)
+        self.label_ids = np.empty(0, dtype=np.int32)
+        self.sigma = 1.0
+        self._index = np.empty((FEATURE_DIM, 0), dtype=np.float32)
+        self._norms = np.empty(0, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.features)
+
+    def add(self, label, points, handedness=None):
+        """Add every hand in ``points`` (N, 21, 3) as a template for ``label``."""
+        rows = normalize_landmarks(points, handedness, self.mirror_left)
+        if label not in self.classes:
+            self.classes.append(label)
+        label_id = self.classes.index(label)
+        self.features = np.concatenate([self.features, rows])
+        self.label_ids = np.concatenate([self.label_ids,
+                                         np.full(len(rows), label_id, dtype=np.int32)])
+        self._build()
+
+    def _build(self, calibration_size=1000):
+        # Transposed copy so the (N, 40) x (40, M) product runs on contiguous memory
+        self._index = np.ascontiguousarray(self.features.T)
+        self._norms = np.einsum('ij,ij->i', self.features, self.features)
+        if len(self.features) < 2:
+            return
+        # Nearest same-label neighbour per template, on a bounded sample
+        step = max(1, len(self.features) // calibration_size)
+        sample = np.arange(0, len(self.features), step)
+        d2 = self._distances(self.features[sample])
+        d2[np.arange(len(sample)), sample] = np.inf
+        same = self.label_ids[sample][:, np.newaxis] == self.label_ids[np.newaxis]
+        nearest = np.where(same, d2, np.inf).min(axis=1)
+        nearest = nearest[np.isfinite(nearest)]
+        if len(nearest):
+            self.sigma = max(float(np.sqrt(np.median(nearest))), 0.02)
+
+    def _distances(self, rows):
+        d2 = rows @ self._index
+        d2 *= -2.0
+        d2 += self._norms
+        d2 += np.einsum('ij,ij->i', rows, rows)[:, np.newaxis]
+        return np.maximum(d2, 0.0, out=d2)
+
+    def classify(self, points, features=None, handedness=None):
+        count = len(points)
+        if not len(self.features):
+            if self.fallback is not None:
+                return self.fallback.classify(points, features, handedness)
+            return [UNKNOWN] * count, np.zeros(count, dtype=np.float32)
+
+        rows = normalize_landmarks(points, handedness, self.mirror_left)
+        d2 = self._distances(rows)
+        k = min(self.k, len(self.features))
+        nearest = np.argpartition(d2, k - 1, axis=1)[:, :k]
+        weights = np.exp(-np.take_along_axis(d2, nearest, axis=1) / (2.0 * self.sigma ** 2))
+
+        classes = len(self.classes)
+        votes = self.label_ids[nearest] + np.arange(count)[:, np.newaxis] * classes
+        scores = np.bincount(votes.ravel(), weights.ravel(), count * classes).reshape(count, classes)
+        best = scores.argmax(axis=1)
+        reject = np.exp(-self.reject_sigmas ** 2 / 2.0)
+        confidences = scores[np.arange(count), best] / (scores.sum(axis=1) + reject)
+
+        labels = [self.classes[i] for i in best]
+        low = np.flatnonzero(confidences < self.min_confidence)
+        if len(low):
+            if self.fallback is not None:
+                fallback_labels, fallback_conf = self.fallback.classify(
+                    points, features, handedness)
+                for i in low:
+                    labels[i] = fallback_labels[i]
+                    confidences[i] = fallback_conf[i]
+            else:
+                for i in low:
+                    labels[i] = UNKNOWN
+        return labels, confidences.astype(np.float32)
+
+    def save(self, path):
+        np.savez(path, features=self.features, label_ids=self.label_ids,
+                 classes=np.array(self.classes), mirror_left=self.mirror_left)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        data = np.load(path)
+        classifier = cls(mirror_left=bool(data['mirror_left']), **kwargs)
+        classifier.classes = data['classes'].tolist()
+        classifier.features = data['features'].astype(np.float32)
+        classifier.label_ids = data['label_ids'].astype(np.int32)
+        classifier._build()
+        return classifier
+
+
+def main():
+    from trace_io import TraceReader
+
+    parser = argparse.ArgumentParser(description="Kelola template gesture")
+    sub = parser.add_subparsers(dest='command', required=True)
+    add = sub.add_parser('add', help="Tambah template dari trace rekaman (main.py --record)")
+    add.add_argument('templates', help="File template .npz (dibuat jika belum ada)")
+    add.add_argument('label', help="Nama gesture, mis. Pinch")
+    add.add_argument('trace', help="Trace .hgt berisi gesture yang ditahan")
+    add.add_argument('--step', type=int, default=3, help="Ambil setiap N frame")
+    show = sub.add_parser('list', help="Tampilkan jumlah template per gesture")
+    show.add_argument('templates')
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        classifier = TemplateClassifier.load(args.templates)
+        for i, label in enumerate(classifier.classes):
+            print(f"{label:<16} {int((classifier.label_ids == i).sum())} template")
+        print(f"sigma {classifier.sigma:.3f}")
+        return
+
+    try:
+        classifier = TemplateClassifier.load(args.templates)
+    except FileNotFoundError:
+        classifier = TemplateClassifier()
+    points, handedness = [], []
+    for index, frame in enumerate(TraceReader(args.trace)):
+        if index % args.step or not len(frame.points):
+            continue
+        # Trace landmarks are normalized; restore the aspect ratio before normalizing
+        points.append(frame.points[0] * np.array([frame.width, frame.height, 1.0], dtype=np.float32))
+        handedness.append(frame.handedness[0])
+    if not points:
+        parser.error(f"tidak ada tangan di {args.trace}")
+    classifier.add(args.label, np.stack(points), handedness)
+    classifier.save(args.templates)
+    print(f"{len(points)} template '{args.label}' ditambahkan, total {len(classifier)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# gesture_features.py
+import numpy as np
+
+FINGER_NAMES = ('thumb', 'index', 'middle', 'ring', 'pinky')
+
+# (base, joint, next joint) landmark indices used for each finger's bend angle
+FINGER_ANGLE_JOINTS = np.array([
+    [0, 1, 2],
+    [0, 5, 6],
+    [0, 9, 10],
+    [0, 13, 14],
+    [0, 17, 18],
+])
+
+FINGERTIP_IDS = np.array([4, 8, 12, 16, 20])
+
+EXTENDED_ANGLE = 150
+BENT_ANGLE = 90
+
+GESTURE_NAMES = ("Open Palm", "Fist", "Pointing", "Peace", "Thumbs Up")
+
+
+class HandFeatures:
+    """Geometry features for N hands (or N recorded frames of one hand).
+
+    angles:        (N, 5) bend angle per finger in degrees
+    tip_distances: (N, 5) fingertip-to-wrist distance, in units of palm size
+    pinch_distance:(N,)   thumb tip to index tip distance in pixels
+    fingers_up:    (N, 5) True where the finger is extended
+    """
+
+    __slots__ = ('angles', 'tip_distances', 'pinch_distance', 'fingers_up')
+
+    def __init__(self, angles, tip_distances, pinch_distance, fingers_up):
+        self.angles = angles
+        self.tip_distances = tip_distances
+        self.pinch_distance = pinch_distance
+        self.fingers_up = fingers_up
+
+    def __len__(self):
+        return len(self.angles)
+
+    def angle_dict(self, i=0):
+        return dict(zip(FINGER_NAMES, self.angles[i].tolist()))
+
+
+def compute_features(points):
+    """Compute HandFeatures for an (N, 21, 3) or (21, 3) landmark array in one pass."""
+    points = np.asarray(points, dtype=np.float32)
+    if points.ndim == 2:
+        points = points[np.newaxis]
+    xy = points[:, :, :2]
+
+    p1 = xy[:, FINGER_ANGLE_JOINTS[:, 0]]
+    p2 = xy[:, FINGER_ANGLE_JOINTS[:, 1]]
+    p3 = xy[:, FINGER_ANGLE_JOINTS[:, 2]]
+    angles = np.degrees(np.arctan2(p3[..., 1] - p2[..., 1], p3[..., 0] - p2[..., 0]) -
+                        np.arctan2(p1[..., 1] - p2[..., 1], p1[..., 0] - p2[..., 0]))
+    angles = np.abs(angles)
+    angles = np.where(angles > 180, 360 - angles, angles)
+
+    wrist = xy[:, 0:1]
+    palm_size = np.linalg.norm(xy[:, 9] - xy[:, 0], axis=1)
+    palm_size = np.maximum(palm_size, 1e-6)
+    tip_distances = np.linalg.norm(xy[:, FINGERTIP_IDS] - wrist, axis=2) / palm_size[:, np.newaxis]
+    pinch_distance = np.linalg.norm(xy[:, 4] - xy[:, 8], axis=1)
+
+    return HandFeatures(angles, tip_distances, pinch_distance, angles > EXTENDED_ANGLE)
+
+
+def classify_features(features):
+    """Apply the threshold gesture rules to every hand in ``features`` at once."""
+    angles = features.angles
+    extended = angles > EXTENDED_ANGLE
+    bent = angles < BENT_ANGLE
+
+    conditions = [
+        extended.all(axis=1),
+        bent.all(axis=1),
+        extended[:, 1] & bent[:, [0, 2, 3, 4]].all(axis=1),
+        extended[:, 1] & extended[:, 2] & bent[:, [0, 3, 4]].all(axis=1),
+        extended[:, 0] & bent[:, 1:].all(axis=1),
+    ]
+    return np.select(conditions, GESTURE_NAMES, default="Unknown").tolist()
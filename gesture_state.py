@@ -0,0 +1,75 @@
+# gesture_state.py
+
+
+class GestureTrigger:
+    """Turns a per-frame boolean into one-shot events, driven by frame timestamps.
+
+    The trigger fires once the condition has been active for ``hold``
+    seconds. It re-arms only after the condition has been inactive for
+    ``release`` seconds and at least ``cooldown`` seconds have passed since
+    it fired, so a held or flickering gesture fires exactly once. Nothing
+    here sleeps; callers just feed it every frame.
+    """
+
+    IDLE, PENDING, FIRED = 'idle', 'pending', 'fired'
+
+    __slots__ = ('hold', 'cooldown', 'release', 'state', 'since', 'last_fired', 'inactive_since')
+
+    def __init__(self, hold=0.0, cooldown=0.0, release=0.0):
+        self.hold = hold
+        self.cooldown = cooldown
+        self.release = release
+        self.reset()
+
+    def reset(self):
+        self.state = self.IDLE
+        self.since = None
+        self.last_fired = float('-inf')
+        self.inactive_since = None
+
+    def update(self, active, now):
+        if self.state == self.FIRED:
+            if active:
+                self.inactive_since = None
+                return False
+            if self.inactive_since is None:
+                self.inactive_since = now
+            if (now - self.inactive_since >= self.release
+                    and now - self.last_fired >= self.cooldown):
+                self.state = self.IDLE
+            return False
+
+        if not active:
+            self.state = self.IDLE
+            return False
+        if self.state == self.IDLE:
+            self.state = self.PENDING
+            self.since = now
+        if now - self.since >= self.hold and now - self.last_fired >= self.cooldown:
+            self.state = self.FIRED
+            self.last_fired = now
+            self.inactive_since = None
+            return True
+        return False
+
+
+class HysteresisThreshold:
+    """Boolean "value is below threshold" with separate enter/exit levels.
+
+    Turns on when the value drops below ``enter`` and off only when it rises
+    above ``exit``, so noise around a single threshold does not flicker.
+    """
+
+    __slots__ = ('enter', 'exit', 'active')
+
+    def __init__(self, enter, exit):
+        self.enter = enter
+        self.exit = exit
+        self.active = False
+
+    def update(self, value):
+        if self.active:
+            self.active = value < self.exit
+        else:
+            self.active = value < self.enter
+        return self.active
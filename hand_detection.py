@@ -3,6 +3,8 @@ import mediapipe as mp
 import math
 import numpy as np
 
+from gesture_features import classify_features, compute_features
+
 class HandDetector:
     def __init__(self, mode=False, maxHands=2, modelComplexity=1, detectionCon=0.7, trackCon=0.7):
         self.mode = mode
@@ -64,24 +66,19 @@ class HandDetector:
 
         return fingers
 
-    def detectGesture(self, lmList):
+    def detectGesture(self, lmList, pinch_threshold=30):
+        # Same rules and labels as ModernHandTracker (gesture_features), so
+        # both detectors agree; Pinch is checked on top of them as before
         if not lmList:
             return "No Hand"
-            
-        fingers = self.fingersUp(lmList)
         
-        if sum(fingers) == 0:
-            return "Fist"
-        elif sum(fingers) == 5:
-            return "Open Hand"
-        elif fingers == [0,1,0,0,0]:
-            return "Point"
-        elif fingers == [0,1,1,0,0]:
-            return "Peace"
-        elif self.isHandPinching(lmList):
-            return "Pinch"
+        points = np.array([lm[1:4] for lm in lmList], dtype=np.float32)
+        features = compute_features(points)
+        gesture = classify_features(features)[0]
         
-        return "Unknown"
+        if gesture not in ("Fist", "Open Palm") and self.isHandPinching(lmList, pinch_threshold):
+            return "Pinch"
+        return gesture
 
     def isHandPinching(self, lmList, threshold=30):
         if len(lmList) < 20:
@@ -0,0 +1,122 @@
+# hand_identity.py
+import itertools
+
+import numpy as np
+
+
+class TrackedHand:
+    """A hand identity that persists across frames, with its own per-hand state."""
+
+    __slots__ = ('hand_id', 'handedness', 'centroid', 'first_seen', 'last_seen', 'role', 'state')
+
+    def __init__(self, hand_id, handedness, centroid, now):
+        self.hand_id = hand_id
+        self.handedness = handedness
+        self.centroid = centroid
+        self.first_seen = now
+        self.last_seen = now
+        self.role = None
+        # Per-hand filters and gesture triggers, created on demand by the owner
+        self.state = {}
+
+
+class HandIdentityTracker:
+    """Gives each detected hand a stable ID by frame-to-frame centroid association.
+
+    Each frame, hands are matched greedily to the nearest existing track
+    (centroids normalized by the frame diagonal; a handedness mismatch adds
+    a penalty). Matches farther than ``max_distance`` start a new track, and
+    tracks unseen for ``max_missing`` seconds are dropped. With at most
+    ``max_hands`` hands per frame the cost stays O(max_hands^2).
+
+    Roles: the ``cursor`` role goes to the hand with ``cursor_handedness``
+    (else the longest-tracked hand) and stays with it while it is visible;
+    any other hand gets the ``action`` role.
+    """
+
+    def __init__(self, max_distance=0.25, max_missing=0.5, handedness_penalty=0.15,
+                 cursor_handedness='Right'):
+        self.max_distance = max_distance
+        self.max_missing = max_missing
+        self.handedness_penalty = handedness_penalty
+        self.cursor_handedness = cursor_handedness
+        self.tracks = {}
+        self._ids = itertools.count(1)
+        self.cursor_id = None
+
+    def update(self, hands, frame_shape, now):
+        """Assign ``hand_id`` and ``role`` on every hand of this frame; returns the hands."""
+        self._expire(now)
+        if not hands:
+            return hands
+
+        h, w = frame_shape[:2]
+        diagonal = float(np.hypot(w, h))
+        centroids = hands.array[:, :, :2].mean(axis=1) / diagonal
+
+        track_list = list(self.tracks.values())
+        pairs = []
+        for i, hand in enumerate(hands):
+            for track in track_list:
+                distance = float(np.hypot(*(centroids[i] - track.centroid)))
+                if hand.handedness and track.handedness and hand.handedness != track.handedness:
+                    distance += self.handedness_penalty
+                if distance <= self.max_distance:
+                    pairs.append((distance, i, track.hand_id))
+        pairs.sort()
+
+        assigned = {}
+        used_tracks = set()
+        for distance, i, hand_id in pairs:
+            if i in assigned or hand_id in used_tracks:
+                continue
+            assigned[i] = hand_id
+            used_tracks.add(hand_id)
+
+        for i, hand in enumerate(hands):
+            if i in assigned:
+                track = self.tracks[assigned[i]]
+                track.centroid = centroids[i]
+                track.last_seen = now
+                if hand.handedness:
+                    track.handedness = hand.handedness
+            else:
+                track = TrackedHand(next(self._ids), hand.handedness, centroids[i], now)
+                self.tracks[track.hand_id] = track
+            hand.hand_id = track.hand_id
+
+        self._assign_roles(hands)
+        return hands
+
+    def _expire(self, now):
+        for hand_id in [hid for hid, track in self.tracks.items()
+                        if now - track.last_seen > self.max_missing]:
+            del self.tracks[hand_id]
+            if hand_id == self.cursor_id:
+                self.cursor_id = None
+
+    def _assign_roles(self, hands):
+        visible = [hand.hand_id for hand in hands]
+        if self.cursor_id not in visible:
+            preferred = [hand.hand_id for hand in hands
+                         if hand.handedness == self.cursor_handedness]
+            candidates = preferred or visible
+            self.cursor_id = min(candidates, key=lambda hid: self.tracks[hid].first_seen)
+        for hand in hands:
+            role = 'cursor' if hand.hand_id == self.cursor_id else 'action'
+            hand.role = role
+            self.tracks[hand.hand_id].role = role
+
+    def state_for(self, hand):
+        """Per-hand state dict for ``hand``, or None if it has no identity yet."""
+        track = self.tracks.get(getattr(hand, 'hand_id', None))
+        return None if track is None else track.state
+
+
+def role_hands(hands):
+    """(cursor_hand, action_hand) for a frame; with one hand (or no roles) both are the first hand."""
+    if not hands:
+        return None, None
+    cursor = next((hand for hand in hands if getattr(hand, 'role', None) == 'cursor'), hands[0])
+    action = next((hand for hand in hands if getattr(hand, 'role', None) == 'action'), cursor)
+    return cursor, action
@@ -1,25 +1,62 @@
 # hand_tracker.py
 import cv2
-import mediapipe as mp
 import numpy as np
-import math
+import threading
 from typing import List, Tuple, Dict
+from landmarks import FrameHands, HandLandmarks, LandmarkBuffer, as_points
+from overlay import connection_groups, draw_landmarks
+from gesture_features import compute_features
+from gesture_classifier import RuleClassifier
+from profiler import NULL_PROFILER
 
 class ModernHandTracker:
     def __init__(self, 
                  static_mode=False,
                  max_hands=2,
                  detection_confidence=0.7,
-                 tracking_confidence=0.7):
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
+                 tracking_confidence=0.7,
+                 inference_width=640,
+                 roi_tracking=False):
+        # mediapipe is imported and the graph built on first use (or by
+        # warm_up), so constructing a tracker is cheap and replays that only
+        # load recorded landmarks never load the model at all
+        self.hands_options = dict(
             static_image_mode=static_mode,
             max_num_hands=max_hands,
             min_detection_confidence=detection_confidence,
             min_tracking_confidence=tracking_confidence
         )
-        self.mp_draw = mp.solutions.drawing_utils
-        self.mp_styles = mp.solutions.drawing_styles
+        self._hands = None
+        self._hands_lock = threading.Lock()
+        self.landmark_buffer = LandmarkBuffer(max_hands)
+        self.profiler = NULL_PROFILER
+        # Landmark drawing in find_hands: 'full', 'lite' or 'off' (see overlay.py)
+        self.overlay_level = 'full'
+        self._connection_groups = None
+        # Any object with classify(points, features, handedness) -> (labels, confidences)
+        self.gesture_classifier = RuleClassifier()
+        
+        # Detection runs on a downscaled copy of the frame; landmarks are
+        # normalized, so they project straight back to full-frame pixels.
+        # None keeps the full capture resolution.
+        self.inference_width = inference_width
+        # Reused conversion outputs, so steady-state frames allocate no
+        # full-size buffers
+        self._buffers = {}
+        
+        # ROI tracking is done by MediaPipe's tracking-mode graph itself: it
+        # runs the landmark model on a region derived from the previous
+        # frame's landmarks and only runs palm detection on the full frame
+        # while it tracks fewer than max_num_hands hands. Cropping outside
+        # the graph would change its input from frame to frame and break
+        # that prior, so roi_tracking keeps the graph in tracking mode and
+        # counts which frames skipped palm detection.
+        self.roi_tracking = roi_tracking
+        if roi_tracking:
+            self.hands_options['static_image_mode'] = False
+        self.roi_hits = 0
+        self.full_detections = 0
+        self._tracked_hands = 0
         
         self.custom_connections_style = {
             (0, 1): (245, 117, 66),  # Wrist to thumb base (orange)
@@ -44,88 +81,198 @@ class ModernHandTracker:
             (19, 20): (245, 233, 66)
         }
 
-    def find_hands(self, img, draw_fancy=True):
-        imgRGB = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        self.results = self.hands.process(imgRGB)
-        all_hands = []
-        h, w, c = img.shape
+    @property
+    def hands(self):
+        """The MediaPipe Hands graph, built on first access."""
+        if self._hands is None:
+            with self._hands_lock:
+                if self._hands is None:
+                    import mediapipe as mp
+                    self._hands = mp.solutions.hands.Hands(**self.hands_options)
+        return self._hands
+
+    def warm_up(self, frame_shape=(480, 640)):
+        """Build the graph and run one blank frame through it.
+
+        The first process() call initializes the inference runtime, so doing
+        it here (e.g. while the camera opens) keeps it off the first real frame.
+        """
+        h, w = frame_shape[:2]
+        self._process(self.prepare_input(np.zeros((h, w, 3), dtype=np.uint8)))
+
+    def close(self):
+        if self._hands is not None:
+            self._hands.close()
+            self._hands = None
+
+    def prepare_input(self, img):
+        with self.profiler.section('color_convert'):
+            return self._convert_input(img)
+
+    def _buffer(self, name, shape):
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != shape:
+            buffer = self._buffers[name] = np.empty(shape, dtype=np.uint8)
+        return buffer
+
+    def _convert_input(self, img):
+        h, w = img.shape[:2]
+        if self.inference_width and w > self.inference_width:
+            size = (self.inference_width, max(1, round(h * self.inference_width / w)))
+            small = self._buffer('small', (size[1], size[0], 3))
+            cv2.resize(img, size, dst=small, interpolation=cv2.INTER_LINEAR)
+            return cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=self._buffer('rgb', small.shape))
+        return cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=self._buffer('rgb', img.shape))
+
+    def hand_bounds(self, hand_points):
+        xy = as_points(hand_points)[:, :2]
+        x_min, y_min = xy.min(axis=0)
+        x_max, y_max = xy.max(axis=0)
+        return int(x_min), int(y_min), int(x_max), int(y_max)
+
+    def detect(self, img):
+        """Run MediaPipe on the full frame and update the ROI tracking counters."""
+        results = self._process(self.prepare_input(img))
+        if self.roi_tracking:
+            # The graph skips palm detection on frames that follow one where
+            # all max_num_hands hands were tracked
+            if self._tracked_hands >= self.hands_options['max_num_hands']:
+                self.roi_hits += 1
+            else:
+                self.full_detections += 1
+            self._tracked_hands = len(results.multi_hand_landmarks or ())
+        return results
+
+    def _process(self, img_rgb):
+        with self.profiler.section('hands_process'):
+            return self.hands.process(img_rgb)
+
+    def roi_stats(self):
+        total = self.roi_hits + self.full_detections
+        return {
+            'roi_hits': self.roi_hits,
+            'full_detections': self.full_detections,
+            'roi_hit_rate': self.roi_hits / total if total else 0.0,
+        }
+
+    def find_hands(self, img, draw_fancy=True, landmarks=None):
+        """Detect hands in ``img`` and return (img, FrameHands).
+
+        Landmarks are written to the next LandmarkBuffer slot, or to
+        ``landmarks`` (a (max_hands, 21, 3) float32 array) when the caller
+        manages their lifetime, as the threaded pipeline does per frame slot.
+        """
+        self.results = self.detect(img)
+        h, w = img.shape[:2]
+        all_hands = FrameHands()
         
         if self.results.multi_hand_landmarks:
-            for hand_landmarks in self.results.multi_hand_landmarks:
-                hand_points = []
-                
-                for lm in hand_landmarks.landmark:
-                    px, py, pz = int(lm.x * w), int(lm.y * h), lm.z
-                    hand_points.append({'x': px, 'y': py, 'z': pz})
-                
-                all_hands.append(hand_points)
-                
-                if draw_fancy:
-                    for connection in self.mp_hands.HAND_CONNECTIONS:
-                        start_idx = connection[0]
-                        end_idx = connection[1]
-                        
-                        start_pos = hand_points[start_idx]
-                        end_pos = hand_points[end_idx]
-                        
-                        color = self.custom_connections_style.get(connection, (255, 255, 255))
-                        
-                        cv2.line(img, 
-                                (start_pos['x'], start_pos['y']),
-                                (end_pos['x'], end_pos['y']),
-                                color, 2, cv2.LINE_AA)
-                        
-                    for point in hand_points:
-                        cv2.circle(img, (point['x'], point['y']), 6, (255, 255, 255), -1)
-                        cv2.circle(img, (point['x'], point['y']), 4, (75, 75, 75), -1)
+            detected = self.results.multi_hand_landmarks[:self.landmark_buffer.max_hands]
+            slot = self.landmark_buffer.acquire() if landmarks is None else landmarks
+            frame_points = slot[:len(detected)]
+            for i, hand_landmarks in enumerate(detected):
+                frame_points[i] = [(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark]
+            
+            # Project normalized landmarks into full-frame pixels in one pass
+            frame_points[:, :, 0] *= w
+            frame_points[:, :, 1] *= h
+            
+            labels, scores = [], []
+            for handedness in (self.results.multi_handedness or [])[:len(detected)]:
+                labels.append(handedness.classification[0].label)
+                scores.append(handedness.classification[0].score)
+            all_hands = self._wrap_hands(frame_points, labels, scores)
+            
+            if draw_fancy:
+                self.draw_hands(img, all_hands)
                         
         return img, all_hands
 
+    def load_hands(self, points, handedness=(), scores=(), frame_shape=(480, 640)):
+        """Build the find_hands result from normalized (n, 21, 3) landmarks.
+
+        Used to feed the tracker from recorded traces or from inference done
+        elsewhere, without running MediaPipe here.
+        """
+        count = min(len(points), self.landmark_buffer.max_hands)
+        if count == 0:
+            return FrameHands()
+        h, w = frame_shape[:2]
+        frame_points = self.landmark_buffer.acquire()[:count]
+        np.multiply(points[:count], (w, h, 1.0), out=frame_points, casting='unsafe')
+        return self._wrap_hands(frame_points, list(handedness), list(scores))
+
+    def _wrap_hands(self, frame_points, labels, scores):
+        all_hands = FrameHands(array=frame_points)
+        for i in range(len(frame_points)):
+            label = labels[i] if i < len(labels) else None
+            score = scores[i] if i < len(scores) else 1.0
+            all_hands.append(HandLandmarks(frame_points[i], label, score))
+        return all_hands
+
+    def draw_hands(self, img, hands):
+        """Draw all hands of a frame in one batched pass."""
+        if self._connection_groups is None:
+            self._connection_groups = connection_groups(self.custom_connections_style)
+        if isinstance(hands, FrameHands):
+            points = hands.array
+        else:
+            points = [as_points(hand) for hand in hands]
+        return draw_landmarks(img, points, self._connection_groups, self.overlay_level)
+
+    def draw_hand(self, img, hand):
+        return self.draw_hands(img, [hand])
+
+    def analyze_hands(self, hands):
+        """Compute features and gestures for all hands of a frame in one NumPy pass.
+
+        Results are cached on each HandLandmarks, so later get_gesture /
+        calculate_finger_angles calls for the same frame are free.
+        """
+        pending = [hand for hand in hands
+                   if isinstance(hand, HandLandmarks) and 'gesture' not in hand.cache]
+        if not pending:
+            return
+        if isinstance(hands, FrameHands) and len(pending) == len(hands):
+            points = hands.array
+        else:
+            points = np.stack([hand.points for hand in pending])
+        features = compute_features(points)
+        gestures, confidences = self.gesture_classifier.classify(
+            points, features, [hand.handedness for hand in pending])
+        for i, hand in enumerate(pending):
+            hand.cache['features'] = (features, i)
+            hand.cache['gesture'] = gestures[i]
+            hand.cache['gesture_confidence'] = float(confidences[i])
+
+    def hand_features(self, hand_points):
+        """Return (HandFeatures, row) for one hand, using the per-frame cache when available."""
+        if isinstance(hand_points, HandLandmarks):
+            if 'features' not in hand_points.cache:
+                self.analyze_hands([hand_points])
+            return hand_points.cache['features']
+        return compute_features(as_points(hand_points)), 0
+
     def get_gesture(self, hand_points):
         if not hand_points:
             return "No Hand"
-            
-        angles = self.calculate_finger_angles(hand_points)
         
-        if all(angle > 150 for angle in angles.values()):
-            return "Open Palm"
-        elif all(angle < 90 for angle in angles.values()):
-            return "Fist"
-        elif angles['index'] > 150 and all(angle < 90 for finger, angle in angles.items() if finger != 'index'):
-            return "Pointing"
-        elif angles['index'] > 150 and angles['middle'] > 150 and all(angle < 90 for finger, angle in angles.items() if finger not in ['index', 'middle']):
-            return "Peace"
-        elif angles['thumb'] > 150 and all(angle < 90 for finger, angle in angles.items() if finger != 'thumb'):
-            return "Thumbs Up"
+        if isinstance(hand_points, HandLandmarks):
+            if 'gesture' not in hand_points.cache:
+                self.analyze_hands([hand_points])
+            return hand_points.cache['gesture']
         
-        return "Unknown"
+        features, _ = self.hand_features(hand_points)
+        return self.gesture_classifier.classify(as_points(hand_points)[np.newaxis], features)[0][0]
+
+    def gesture_confidence(self, hand_points):
+        """Confidence of get_gesture's answer for a HandLandmarks (0..1)."""
+        self.get_gesture(hand_points)
+        return hand_points.cache.get('gesture_confidence', 0.0)
 
     def calculate_finger_angles(self, hand_points):
         if not hand_points:
             return {}
-            
-        angles = {}
-        finger_bases = {
-            'thumb': [0, 1, 2],
-            'index': [0, 5, 6],
-            'middle': [0, 9, 10],
-            'ring': [0, 13, 14],
-            'pinky': [0, 17, 18]
-        }
         
-        for finger, points in finger_bases.items():
-            p1 = hand_points[points[0]]
-            p2 = hand_points[points[1]]
-            p3 = hand_points[points[2]]
-            
-            angle = math.degrees(math.atan2(p3['y'] - p2['y'], p3['x'] - p2['x']) -
-                               math.atan2(p1['y'] - p2['y'], p1['x'] - p2['x']))
-            
-            angle = abs(angle)
-            if angle > 180:
-                angle = 360 - angle
-                
-            angles[finger] = angle
-            
-        return angles
-
+        features, row = self.hand_features(hand_points)
+        return features.angle_dict(row)
@@ -0,0 +1,145 @@
+# input_dispatcher.py
+import threading
+import time
+from collections import deque
+
+from pipeline import StageStats
+
+
+class PyAutoGUIBackend:
+    """Injects events through pyautogui."""
+
+    def __init__(self):
+        import pyautogui
+        pyautogui.FAILSAFE = False
+        # pyautogui sleeps PAUSE seconds after every call by default
+        pyautogui.PAUSE = 0
+        self.pyautogui = pyautogui
+
+    def size(self):
+        return self.pyautogui.size()
+
+    def move(self, x, y):
+        self.pyautogui.moveTo(x, y)
+
+    def click(self):
+        self.pyautogui.click()
+
+    def press(self, key):
+        self.pyautogui.press(key)
+
+
+class InputDispatcher:
+    """Worker thread that owns all OS input injection.
+
+    Cursor moves are latest-value-wins: if the worker is still busy, a newer
+    position replaces the pending one instead of queueing behind it. Clicks
+    and key presses are queued in order (debouncing is the caller's job, see
+    gesture_state). Callers never block on the OS input layer.
+
+    With ``threaded=False`` events are injected inline instead, which keeps
+    offline replays deterministic.
+    """
+
+    def __init__(self, backend, threaded=True):
+        self.backend = backend
+        self.threaded = threaded
+        self._cond = threading.Condition()
+        self._pending_move = None
+        self._events = deque()
+        self._running = False
+        self._thread = None
+
+        self.move_latency = StageStats()
+        self.event_latency = StageStats()
+        self.moves_submitted = 0
+        self.moves_coalesced = 0
+        self.clicks = 0
+        self.errors = 0
+
+    def start(self):
+        if self._running or not self.threaded:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="input-dispatch", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def move_to(self, x, y):
+        if not self.threaded:
+            self.moves_submitted += 1
+            self._inject(self.backend.move, (x, y), time.perf_counter(), self.move_latency)
+            return
+        with self._cond:
+            self.moves_submitted += 1
+            if self._pending_move is not None:
+                self.moves_coalesced += 1
+            self._pending_move = (x, y, time.perf_counter())
+            self._cond.notify()
+
+    def click(self):
+        self._push(('click',))
+
+    def press(self, key):
+        self._push(('press', key))
+
+    def _push(self, event):
+        if not self.threaded:
+            self._dispatch([(event, time.perf_counter())])
+            return
+        with self._cond:
+            self._events.append((event, time.perf_counter()))
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and self._pending_move is None and not self._events:
+                    self._cond.wait()
+                # On stop, inject whatever is still queued before exiting
+                if self._pending_move is None and not self._events:
+                    return
+                move, self._pending_move = self._pending_move, None
+                events = list(self._events)
+                self._events.clear()
+
+            # Move first, so a click lands at the newest cursor position
+            if move is not None:
+                x, y, submitted = move
+                self._inject(self.backend.move, (x, y), submitted, self.move_latency)
+            self._dispatch(events)
+
+    def _dispatch(self, events):
+        for event, submitted in events:
+            if event[0] == 'click':
+                self.clicks += 1
+                self._inject(self.backend.click, (), submitted, self.event_latency)
+            elif event[0] == 'press':
+                self._inject(self.backend.press, event[1:], submitted, self.event_latency)
+
+    def _inject(self, func, args, submitted, stats):
+        try:
+            func(*args)
+        except Exception as e:
+            self.errors += 1
+            print(f"Input dispatch error: {e}")
+        stats.add(time.perf_counter() - submitted)
+
+    def metrics(self):
+        return {
+            'moves_submitted': self.moves_submitted,
+            'moves_coalesced': self.moves_coalesced,
+            'move_latency_ms': self.move_latency.mean_ms,
+            'move_latency_max_ms': self.move_latency.max_ms,
+            'clicks': self.clicks,
+            'event_latency_ms': self.event_latency.mean_ms,
+            'errors': self.errors,
+        }
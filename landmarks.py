@@ -0,0 +1,129 @@
+# landmarks.py
+from collections.abc import Mapping
+
+import numpy as np
+
+NUM_LANDMARKS = 21
+
+# Same edges as mediapipe's HAND_CONNECTIONS, so drawing does not need mediapipe
+HAND_CONNECTIONS = frozenset([
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+])
+
+
+class LandmarkView(Mapping):
+    """Read-only {'x', 'y', 'z'} view of one landmark row, for callers written against dicts."""
+
+    __slots__ = ('_row',)
+
+    def __init__(self, row):
+        self._row = row
+
+    def __getitem__(self, key):
+        if key == 'x':
+            return int(self._row[0])
+        if key == 'y':
+            return int(self._row[1])
+        if key == 'z':
+            return float(self._row[2])
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(('x', 'y', 'z'))
+
+    def __len__(self):
+        return 3
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class HandLandmarks:
+    """One hand as a (21, 3) float32 array of pixel x, pixel y and relative z.
+
+    Indexing returns a dict-compatible LandmarkView, so code written for the
+    old list-of-dicts format keeps working; new code should use ``points``.
+    """
+
+    __slots__ = ('points', 'handedness', 'score', 'cache', 'hand_id', 'role')
+
+    def __init__(self, points, handedness=None, score=1.0):
+        self.points = points
+        self.handedness = handedness
+        self.score = score
+        # Stable identity and role, filled in by HandIdentityTracker
+        self.hand_id = None
+        self.role = None
+        # Per-frame derived values (features, gesture) keyed by name
+        self.cache = {}
+
+    def __len__(self):
+        return NUM_LANDMARKS
+
+    def __bool__(self):
+        return True
+
+    def __getitem__(self, index):
+        return LandmarkView(self.points[index])
+
+    def __iter__(self):
+        for row in self.points:
+            yield LandmarkView(row)
+
+    @property
+    def xy(self):
+        return self.points[:, :2]
+
+    def pixel(self, index):
+        return int(self.points[index, 0]), int(self.points[index, 1])
+
+    def to_dicts(self):
+        return [dict(view) for view in self]
+
+
+class FrameHands(list):
+    """The HandLandmarks found in one frame, plus the (n, 21, 3) array backing them."""
+
+    def __init__(self, hands=(), array=None):
+        super().__init__(hands)
+        self.array = array if array is not None else np.zeros((0, NUM_LANDMARKS, 3), np.float32)
+
+
+class LandmarkBuffer:
+    """Preallocated ring of (max_hands, 21, 3) landmark arrays.
+
+    A fresh slot is handed out per frame, so a frame's landmarks stay valid
+    while up to ``ring - 1`` newer frames are processed, without allocating
+    per frame. Slots are reused blindly: callers that can run further ahead
+    (the threaded pipeline) pass their own storage to find_hands instead.
+    """
+
+    def __init__(self, max_hands=2, ring=4):
+        self.max_hands = max_hands
+        self._slots = np.zeros((ring, max_hands, NUM_LANDMARKS, 3), dtype=np.float32)
+        self._index = 0
+
+    def acquire(self):
+        slot = self._slots[self._index]
+        self._index = (self._index + 1) % len(self._slots)
+        return slot
+
+
+def as_points(hand_points):
+    """Return the (21, 3) array for a HandLandmarks or a legacy list of dicts."""
+    if isinstance(hand_points, HandLandmarks):
+        return hand_points.points
+    if isinstance(hand_points, np.ndarray):
+        return hand_points
+    return np.array([(p['x'], p['y'], p['z']) for p in hand_points], dtype=np.float32)
+
+
+def point_xy(point):
+    """Return (x, y) for a landmark given as a dict/LandmarkView or an array row."""
+    if isinstance(point, Mapping):
+        return point['x'], point['y']
+    return point[0], point[1]
@@ -5,10 +5,24 @@ Author: Syawal Mods
 Created: 12 12 2024
 """
 
-import cv2
 import time
+# Awal proses, untuk laporan waktu startup (termasuk import di bawah)
+PROCESS_START = time.perf_counter()
+
+import argparse
+import cv2
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from enhanced_hand_tracker import EnhancedHandTracker
+from pipeline import FramePipeline, StageStats
+from profiler import Profiler, StartupTimer
+from overlay import OVERLAY_LEVELS, OverlayRenderer
+from event_server import EventServer
+from frame_scheduler import AdaptiveScheduler
+from gesture_state import GestureTrigger
+from gesture_classifier import RuleClassifier, TemplateClassifier
+from hand_identity import role_hands
+from trace_io import TraceWriter
 
 def print_banner():
     banner = """
@@ -24,107 +38,368 @@ def print_banner():
     print("\nMemulai Hand Gesture Control System...")
     print("Tekan 'q' untuk keluar\n")
 
-def initialize_camera():
+def initialize_camera(source=0, resolution=(1920, 1080)):
     """Inisialisasi kamera dengan pengaturan optimal."""
-    cap = cv2.VideoCapture(0)
+    cap = cv2.VideoCapture(source)
     
     # Pengaturan kamera untuk performa optimal
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1920)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 1080)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, resolution[0])
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, resolution[1])
     cap.set(cv2.CAP_PROP_FPS, 30)
+    # Buffer kecil agar frame setelah jeda mode hemat daya tidak basi
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
     
     if not cap.isOpened():
         raise Exception("Tidak dapat mengakses kamera!")
     
     return cap
 
-def main():
-    try:
-        print_banner()
-        
-        # Inisialisasi kamera
-        cap = initialize_camera()
+# Pengaturan mode
+MODES = ['mouse', 'draw', 'media']
+
+# Mode indikator warna
+MODE_COLORS = {
+    'mouse': (0, 255, 0),    # Hijau
+    'draw': (255, 0, 0),     # Biru
+    'media': (0, 0, 255)     # Merah
+}
+
+WINDOW_NAME = "Hand Gesture Control"
+
+class AppState:
+    """State aplikasi yang dibagi antara loop sekuensial dan pipeline."""
+    def __init__(self):
+        self.current_mode = 0
+        self.recorder = None
+        self.scheduler = None
+        self.profiler = Profiler(enabled=False)
+        self.show_hud = False
+        # Teks HUD sebagai sprite cache, digabung ke frame sekali per frame
+        self.overlay = OverlayRenderer()
+        # Dilaporkan lalu dilepas setelah frame pertama tampil
+        self.startup = None
+        # Mode headless: tanpa jendela, hasil dikirim lewat socket (opsional)
+        self.headless = False
+        self.server = None
+        self.frame_id = 0
         
-        # Inisialisasi hand tracker
-        tracker = EnhancedHandTracker()
+        # Ganti mode saat Fist ditahan; tidak memblokir loop
+        self.mode_trigger = GestureTrigger(hold=0.3, cooldown=1.0, release=0.3)
         
-        # Pengaturan mode
-        modes = ['mouse', 'draw', 'media']
-        current_mode = 0
+        # Aksi media terakhir ditampilkan sebentar
+        self.media_action = None
+        self.media_action_until = 0.0
         
         # Pengaturan FPS
-        fps_start_time = time.time()
-        fps_counter = 0
-        fps = 0
+        self.fps_start_time = time.time()
+        self.fps_counter = 0
+        self.fps = 0
         
-        # Mode indikator warna
-        mode_colors = {
-            'mouse': (0, 255, 0),    # Hijau
-            'draw': (255, 0, 0),     # Biru
-            'media': (0, 0, 255)     # Merah
-        }
+    @property
+    def mode(self):
+        return MODES[self.current_mode]
+    
+    def tick_fps(self):
+        self.fps_counter += 1
+        if time.time() - self.fps_start_time > 1:
+            self.fps = self.fps_counter
+            self.fps_counter = 0
+            self.fps_start_time = time.time()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Hand Gesture Control System")
+    parser.add_argument('--camera', type=int, default=0,
+                        help="Indeks kamera (beberapa kamera sekaligus: multi_stream.py)")
+    parser.add_argument('--resolution', default='1920x1080',
+                        help="Resolusi capture kamera, mis. 1280x720 (area kontrol tetap sama)")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="Jalankan capture, inferensi, dan render di thread terpisah")
+    parser.add_argument('--inference-width', type=int, default=640,
+                        help="Lebar gambar untuk deteksi tangan (0 = resolusi penuh)")
+    parser.add_argument('--roi-tracking', action='store_true',
+                        help="Lacak tangan di area sekitar frame sebelumnya dan hitung "
+                             "frame yang melewati deteksi telapak")
+    parser.add_argument('--record', metavar='PATH',
+                        help="Rekam landmark per frame ke file trace untuk replay.py")
+    parser.add_argument('--profile', action='store_true',
+                        help="Aktifkan timer per tahap dan HUD latensi (toggle HUD dengan 'p')")
+    parser.add_argument('--profile-log', metavar='PATH',
+                        help="Simpan ringkasan latensi p50/p95/p99 ke file .csv atau .json")
+    parser.add_argument('--gesture-templates', metavar='PATH',
+                        help="Klasifikasi gesture dengan template rekaman (gesture_classifier.py)")
+    parser.add_argument('--power-save', action='store_true',
+                        help="Turunkan FPS dan resolusi deteksi saat tidak ada tangan")
+    parser.add_argument('--idle-after', type=float, default=2.0,
+                        help="Detik tanpa tangan sebelum masuk mode hemat daya")
+    parser.add_argument('--idle-fps', type=float, default=5.0,
+                        help="FPS maksimum saat mode hemat daya")
+    parser.add_argument('--idle-width', type=int, default=256,
+                        help="Lebar gambar deteksi saat mode hemat daya")
+    parser.add_argument('--max-fps', type=float, default=0,
+                        help="Batas FPS saat tangan terdeteksi (0 = tanpa batas)")
+    parser.add_argument('--overlay', choices=OVERLAY_LEVELS, default='full',
+                        help="Overlay lengkap, ringan (produksi), atau tanpa overlay")
+    parser.add_argument('--headless', action='store_true',
+                        help="Tanpa jendela; hentikan dengan Ctrl+C")
+    parser.add_argument('--serve', metavar='ADDRESS',
+                        help="Kirim landmark dan event gesture ke klien socket, "
+                             "mis. unix:/tmp/hand.sock atau tcp:127.0.0.1:8765")
+    return parser.parse_args()
+
+def handle_frame(tracker, img, hands, state, timestamp=None):
+    """Proses mode aktif dan gambar overlay untuk satu frame."""
+    profiler = state.profiler
+    now = time.perf_counter() if timestamp is None else timestamp
+    if state.recorder is not None:
+        state.recorder.write(now, hands, img.shape)
+    
+    # ID tangan yang stabil antar frame dan peran (kursor / aksi)
+    tracker.identify_hands(hands, img.shape, now)
+    
+    if hands:
+        # Hitung fitur gesture semua tangan sekali per frame
+        with profiler.section('gesture'):
+            tracker.analyze_hands(hands)
+        
+        # Proses berdasarkan mode aktif
+        with profiler.section('mode'):
+            img = handle_mode(tracker, img, hands, state, now)
+    else:
+        state.mode_trigger.update(False, now)
+    
+    if state.server is not None:
+        state.server.publish_frame(state.frame_id, now, hands, img.shape, state.mode,
+                                   [tracker.get_gesture(hand) for hand in hands])
+    state.frame_id += 1
+    
+    # Hitung FPS
+    state.tick_fps()
+    overlay = state.overlay
+    # HUD profiler diminta eksplisit (--profile / 'p'), jadi tetap tampil
+    # walaupun --overlay off
+    if state.show_hud:
+        profiler.draw_hud(overlay)
+    if not overlay.enabled:
+        return img
+    
+    # Teks hanya dirender ulang saat isinya berubah; digambar di show_frame
+    with profiler.section('overlay'):
+        # Tampilkan mode aktif
+        current_color = MODE_COLORS[state.mode]
+        overlay.text(f"Mode: {state.mode.upper()}", 
+                     (20, 50), 1, current_color, 2)
+        
+        if state.media_action and now < state.media_action_until:
+            overlay.text(f"Media: {state.media_action.replace('_', ' ').title()}", 
+                         (20, 90), 0.7, (0, 255, 0), 2)
+        
+        overlay.text(f"FPS: {state.fps}", 
+                     (20, img.shape[0] - 20), 0.7, (255, 255, 255), 2)
         
+        if state.scheduler is not None and state.scheduler.idle:
+            overlay.text("Hemat daya", 
+                         (img.shape[1] - 180, 40), 0.7, (0, 200, 255), 2)
+        
+        # Label ID dan peran di pergelangan tiap tangan (overlay lengkap saja)
+        if overlay.level == 'full':
+            for hand in hands:
+                wrist_x, wrist_y = hand.pixel(0)
+                overlay.text(f"#{hand.hand_id} {hand.role}", 
+                             (wrist_x - 30, wrist_y + 25), 0.5, (255, 255, 0), 1)
+    return img
+
+def handle_mode(tracker, img, hands, state, now):
+    # Tangan kursor menggerakkan mouse / menggambar, tangan aksi untuk
+    # media dan ganti mode. Dengan satu tangan keduanya tangan yang sama.
+    cursor_hand, action_hand = role_hands(hands)
+    
+    if state.mode == 'mouse':
+        img, is_clicking = tracker.virtual_mouse(cursor_hand, img, now)
+        
+    elif state.mode == 'draw':
+        img = tracker.air_drawing(cursor_hand, img)
+        img = tracker.draw_control_panel(img)
+        
+    elif state.mode == 'media':
+        action = tracker.media_controls(action_hand, now)
+        if action != "none":
+            state.media_action = action
+            state.media_action_until = now + 1.0
+            if state.server is not None:
+                state.server.publish_event('action', now, action=action)
+    
+    # Deteksi pergantian mode
+    gesture = tracker.get_gesture(action_hand)
+    if state.mode_trigger.update(gesture == "Fist", now):
+        state.current_mode = (state.current_mode + 1) % len(MODES)
+        print(f"Mode berubah ke: {state.mode.upper()}")
+        if state.server is not None:
+            state.server.publish_event('mode', now, mode=state.mode)
+    return img
+
+def draw_stage_stats(img, stats, overlay):
+    """Tampilkan latensi per tahap di pojok kanan bawah."""
+    if overlay.level != 'full':
+        return
+    y = img.shape[0] - 20 - 25 * (len(stats) - 1)
+    for name, stage in stats.items():
+        overlay.text(f"{name}: {stage.mean_ms:.1f} ms", 
+                     (img.shape[1] - 260, y), 0.6, (255, 255, 255), 1)
+        y += 25
+
+def show_frame(img, tracker, state):
+    """Tampilkan frame, return False jika pengguna menekan 'q'."""
+    if state.headless:
+        # Tanpa imshow/waitKey; aplikasi dihentikan dengan Ctrl+C
+        key = 0xFF
+    else:
+        with state.profiler.section('composite'):
+            img = state.overlay.composite(img)
+        with state.profiler.section('display'):
+            cv2.imshow(WINDOW_NAME, img)
+            
+            # Cek input keyboard
+            key = cv2.waitKey(1) & 0xFF
+    if state.startup is not None:
+        state.startup.mark('first_frame')
+        print("Waktu startup:")
+        print(state.startup.report())
+        state.startup = None
+    if key == ord('q'):
+        print("\nMenutup aplikasi...")
+        return False
+    elif key == ord('z'):
+        tracker.undo_stroke()
+    elif key == ord('c'):
+        tracker.clear_drawing()
+    elif key == ord('p') and state.profiler.enabled:
+        state.show_hud = not state.show_hud
+    return True
+
+def run_sequential(cap, tracker, state):
+    stats = {name: StageStats() for name in ('capture', 'inference', 'render')}
+    # Satu buffer frame dipakai ulang: kamera decode langsung ke buffer ini,
+    # flip dan overlay juga in-place, jadi tidak ada alokasi frame per iterasi
+    frame = None
+    try:
         while True:
+            # Mode hemat daya: tunggu sampai jadwal frame berikutnya
+            if state.scheduler is not None:
+                state.scheduler.wait()
+            
             # Baca frame dari kamera
-            success, img = cap.read()
+            start = time.perf_counter()
+            with state.profiler.section('capture'):
+                success, frame = cap.read(frame)
             if not success:
                 print("Gagal membaca frame dari kamera!")
                 break
+            stats['capture'].add(time.perf_counter() - start)
+            captured_at = start
                 
             # Flip gambar horizontal untuk tampilan mirror
-            img = cv2.flip(img, 1)
+            start = time.perf_counter()
+            img = cv2.flip(frame, 1, dst=frame)
             
             # Deteksi tangan
             img, hands = tracker.find_hands(img)
+            stats['inference'].add(time.perf_counter() - start)
+            if state.scheduler is not None:
+                state.scheduler.update(bool(hands), captured_at)
             
-            # Tampilkan mode aktif
-            current_color = mode_colors[modes[current_mode]]
-            cv2.putText(img, f"Mode: {modes[current_mode].upper()}", 
-                       (20, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, 
-                       current_color, 2)
-            
-            if hands:
-                # Proses berdasarkan mode aktif
-                if modes[current_mode] == 'mouse':
-                    img, is_clicking = tracker.virtual_mouse(hands[0], img)
-                    
-                elif modes[current_mode] == 'draw':
-                    img = tracker.air_drawing(hands[0], img)
-                    img = tracker.draw_control_panel(img)
-                    
-                elif modes[current_mode] == 'media':
-                    action = tracker.media_controls(hands[0])
-                    if action != "none":
-                        cv2.putText(img, f"Media: {action.replace('_', ' ').title()}", 
-                                  (20, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.7, 
-                                  (0, 255, 0), 2)
-                
-                # Deteksi pergantian mode
-                gesture = tracker.get_gesture(hands[0])
-                if gesture == "Fist":
-                    current_mode = (current_mode + 1) % len(modes)
-                    print(f"Mode berubah ke: {modes[current_mode].upper()}")
-                    time.sleep(0.5)  # Delay untuk mencegah multiple switch
-            
-            # Hitung dan tampilkan FPS
-            fps_counter += 1
-            if time.time() - fps_start_time > 1:
-                fps = fps_counter
-                fps_counter = 0
-                fps_start_time = time.time()
-                
-            cv2.putText(img, f"FPS: {fps}", 
-                       (20, img.shape[0] - 20), cv2.FONT_HERSHEY_SIMPLEX, 
-                       0.7, (255, 255, 255), 2)
+            start = time.perf_counter()
+            img = handle_frame(tracker, img, hands, state, captured_at)
+            draw_stage_stats(img, stats, state.overlay)
             
             # Tampilkan frame
-            cv2.namedWindow("Hand Gesture Control", cv2.WINDOW_NORMAL)
-            cv2.imshow("Hand Gesture Control", img)
-            
-            # Cek input keyboard
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                print("\nMenutup aplikasi...")
+            running = show_frame(img, tracker, state)
+            stats['render'].add(time.perf_counter() - start)
+            if not running:
                 break
+    finally:
+        for name, stage in stats.items():
+            print(f"{name:<10} mean {stage.mean_ms:6.1f} ms  max {stage.max_ms:6.1f} ms")
+
+def run_pipelined(cap, tracker, state):
+    pipeline = FramePipeline(cap, tracker, profiler=state.profiler,
+                             scheduler=state.scheduler).start()
+    try:
+        for frame_id, img, hands, captured_at in pipeline.results():
+            start = time.perf_counter()
+            img = handle_frame(tracker, img, hands, state, captured_at)
+            draw_stage_stats(img, pipeline.stats, state.overlay)
+            running = show_frame(img, tracker, state)
+            pipeline.record_render(time.perf_counter() - start, captured_at)
+            if not running:
+                break
+        if pipeline.error:
+            print(pipeline.error)
+    finally:
+        pipeline.stop()
+        print(pipeline.report())
+
+def main():
+    startup = StartupTimer(origin=PROCESS_START)
+    startup.add('imports', PROCESS_START)
+    args = parse_args()
+    try:
+        print_banner()
+        
+        # Inisialisasi hand tracker (model MediaPipe belum dibuat di sini)
+        with startup.phase('tracker'):
+            tracker = EnhancedHandTracker(inference_width=args.inference_width or None,
+                                          roi_tracking=args.roi_tracking)
+            if args.gesture_templates:
+                # Gesture bawaan (Fist, Peace, ...) tetap dipakai jika tidak ada template yang cocok
+                tracker.gesture_classifier = TemplateClassifier.load(args.gesture_templates,
+                                                                     fallback=RuleClassifier())
+        
+        # Model di-load dan di-warm-up di thread lain selagi kamera dibuka
+        resolution = tuple(int(v) for v in args.resolution.split('x'))
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            warm_up = executor.submit(startup.timed('model', tracker.warm_up))
+            with startup.phase('camera'):
+                cap = initialize_camera(args.camera, resolution)
+            warm_up.result()
+        
+        state = AppState()
+        state.startup = startup
+        # Tanpa jendela overlay tidak terlihat, jadi tidak perlu digambar
+        overlay_level = 'off' if args.headless else args.overlay
+        state.overlay = OverlayRenderer(overlay_level)
+        tracker.overlay_level = overlay_level
+        state.headless = args.headless
+        if args.serve:
+            state.server = EventServer(args.serve).start()
+            print(f"Melayani klien di {args.serve}")
+        if args.profile or args.profile_log:
+            state.profiler.enabled = True
+            # Tanpa jendela HUD tidak pernah di-composite
+            state.show_hud = args.profile and not args.headless
+            tracker.profiler = state.profiler
+        if args.record:
+            state.recorder = TraceWriter(args.record)
+        if args.power_save:
+            state.scheduler = AdaptiveScheduler(tracker, idle_after=args.idle_after,
+                                                idle_fps=args.idle_fps,
+                                                idle_width=args.idle_width,
+                                                active_fps=args.max_fps or None)
+        
+        if not args.headless:
+            with startup.phase('window'):
+                cv2.namedWindow(WINDOW_NAME, cv2.WINDOW_NORMAL)
+        try:
+            if args.pipeline:
+                run_pipelined(cap, tracker, state)
+            else:
+                run_sequential(cap, tracker, state)
+        except KeyboardInterrupt:
+            print("\nMenutup aplikasi...")
+        
+        if args.roi_tracking:
+            roi = tracker.roi_stats()
+            print(f"ROI tracking: {roi['roi_hits']} frame hanya ROI, {roi['full_detections']} "
+                  f"dengan deteksi telapak full-frame ({roi['roi_hit_rate']:.0%} ROI)")
                 
     except Exception as e:
         print(f"Terjadi kesalahan: {str(e)}")
@@ -132,9 +407,35 @@ def main():
         
     finally:
         # Bersihkan resources
+        if 'tracker' in locals():
+            tracker.close()
+        if 'tracker' in locals() and tracker.input_active:
+            metrics = tracker.input.metrics()
+            print(f"Input: {metrics['moves_submitted']} move ({metrics['moves_coalesced']} digabung), "
+                  f"{metrics['clicks']} klik, latensi {metrics['move_latency_ms']:.1f} ms")
+        if 'state' in locals() and state.recorder is not None:
+            state.recorder.close()
+            print(f"Trace tersimpan: {args.record} ({state.recorder.frames} frame)")
+        if 'state' in locals() and state.profiler.enabled:
+            for name, stage in state.profiler.summary().items():
+                print(f"{name:<14} p50 {stage['p50_ms']:6.2f}  p95 {stage['p95_ms']:6.2f}  "
+                      f"p99 {stage['p99_ms']:6.2f} ms")
+            if args.profile_log:
+                state.profiler.export(args.profile_log)
+        if 'state' in locals() and state.server is not None:
+            state.server.stop()
+            stats = state.server.stats()
+            print(f"Server: {stats['frames']} frame, {stats['events']} event, "
+                  f"{stats['clients_served']} klien, {stats['dropped_frames']} frame di-drop "
+                  f"untuk klien lambat, {stats['disconnected_slow']} klien diputus")
+        if 'state' in locals() and state.scheduler is not None:
+            for name, usage in state.scheduler.report().items():
+                print(f"{name:<8} {usage['frames']:6d} frame  {usage['seconds']:7.1f} s  "
+                      f"{usage['fps']:5.1f} FPS  CPU {usage['cpu_percent']:5.1f}%")
         if 'cap' in locals():
             cap.release()
-        cv2.destroyAllWindows()
+        if not args.headless:
+            cv2.destroyAllWindows()
         print("Aplikasi ditutup dengan aman.")
 
 if __name__ == "__main__":
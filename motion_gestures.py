@@ -0,0 +1,175 @@
+# motion_gestures.py
+import math
+
+from landmarks import as_points
+
+# Landmarks averaged for the palm centre (wrist and finger bases)
+PALM_IDS = (0, 5, 9, 13, 17)
+
+
+class MotionTracker:
+    """Swipe, rotation and hold recognition for one hand over a ring buffer of recent frames.
+
+    Each update stores the palm centre, the unwrapped thumb -> index angle
+    and the step length since the previous frame (in palm sizes, so it does
+    not depend on resolution or distance to the camera). The window is the
+    last ``window`` seconds: the path length inside it is a running sum, the
+    newest step is added and steps falling out of the window are subtracted
+    as the tail advances, so an update is O(1) amortized whatever the
+    capacity.
+
+    Events: ``swipe_left/right/up/down`` (straight, fast palm motion),
+    ``rotate_cw/ccw`` (thumb -> index turning in place) and ``hold`` (palm
+    still for ``hold_time``). After a swipe or rotation the tracker is
+    disarmed until the palm's net motion over the last ``rearm_time``
+    seconds is below ``rearm_speed`` palm sizes/s and ``rearm_turn_rate``
+    degrees/s (or the hand was lost), so one motion gives
+    exactly one event however long it lasts; ``hold`` fires once per still
+    period.
+    """
+
+    def __init__(self, capacity=64, window=0.35, swipe_distance=1.5, min_straightness=0.8,
+                 rotation_degrees=60.0, hold_time=0.5, hold_motion=0.3, rearm_speed=1.5,
+                 rearm_turn_rate=60.0, rearm_time=0.15):
+        self.capacity = capacity
+        self.window = window
+        self.swipe_distance = swipe_distance
+        self.min_straightness = min_straightness
+        self.rotation_degrees = rotation_degrees
+        self.hold_time = hold_time
+        self.hold_motion = hold_motion
+        self.rearm_speed = rearm_speed
+        self.rearm_turn_rate = rearm_turn_rate
+        self.rearm_time = rearm_time
+
+        self.t = [0.0] * capacity
+        self.x = [0.0] * capacity
+        self.y = [0.0] * capacity
+        self.angle = [0.0] * capacity
+        self.step = [0.0] * capacity
+        self.reset()
+
+    def reset(self):
+        self.head = -1
+        self.tail = -1
+        self.count = 0
+        self.path = 0.0
+        self.raw_angle = 0.0
+        self.palm_size = 1.0
+        self.still_since = None
+        self.holding = False
+        self.armed = True
+
+    def update(self, hand_points, now):
+        """Add this frame's landmarks; returns the event recognized on this frame, or None."""
+        points = as_points(hand_points)
+        palm_size = math.hypot(points[9, 0] - points[0, 0], points[9, 1] - points[0, 1]) or 1.0
+        x = sum(float(points[i, 0]) for i in PALM_IDS) / len(PALM_IDS)
+        y = sum(float(points[i, 1]) for i in PALM_IDS) / len(PALM_IDS)
+        raw_angle = math.degrees(math.atan2(points[8, 1] - points[4, 1],
+                                            points[8, 0] - points[4, 0]))
+        self.palm_size = palm_size
+        self._push(x, y, raw_angle, now)
+        return self._detect(now)
+
+    def _push(self, x, y, raw_angle, now):
+        head = self.head
+        if self.count and now - self.t[head] > self.window:
+            # Hand was lost for longer than the window: start over
+            self.count = 0
+            self.path = 0.0
+            self.armed = True
+        if self.count:
+            delta = (raw_angle - self.raw_angle + 180.0) % 360.0 - 180.0
+            angle = self.angle[head] + delta
+            step = math.hypot(x - self.x[head], y - self.y[head]) / self.palm_size
+        else:
+            angle, step = raw_angle, 0.0
+        self.raw_angle = raw_angle
+
+        head = (head + 1) % self.capacity
+        if self.count == self.capacity:
+            self._advance_tail()
+        self.head = head
+        self.t[head], self.x[head], self.y[head] = now, x, y
+        self.angle[head], self.step[head] = angle, step
+        if self.count == 0:
+            self.tail = head
+        else:
+            self.path += step
+        self.count += 1
+        while self.count > 1 and now - self.t[self.tail] > self.window:
+            self._advance_tail()
+
+    def _advance_tail(self):
+        self.tail = (self.tail + 1) % self.capacity
+        self.path -= self.step[self.tail]
+        self.count -= 1
+
+    def _clear_window(self):
+        self.tail = self.head
+        self.count = 1
+        self.path = 0.0
+
+    def _rearm(self):
+        """Re-arm once the palm has (nearly) stopped; returns True when armed.
+
+        Net motion over rearm_time is used rather than the last step, so
+        landmark jitter on a still hand does not keep the tracker disarmed.
+        """
+        head = i = self.head
+        n = 1
+        while n < self.count and self.t[head] - self.t[i] < self.rearm_time:
+            i = (i - 1) % self.capacity
+            n += 1
+        span = self.t[head] - self.t[i]
+        if span < self.rearm_time:
+            return False
+        moved = math.hypot(self.x[head] - self.x[i], self.y[head] - self.y[i]) / self.palm_size
+        turned = abs(self.angle[head] - self.angle[i])
+        if moved > self.rearm_speed * span or turned > self.rearm_turn_rate * span:
+            return False
+        # The next motion starts here, not with the end of the previous one
+        self.armed = True
+        self._clear_window()
+        return True
+
+    def _detect(self, now):
+        # Hold: palm (nearly) still across the window for hold_time. It
+        # re-arms only after clearly moving (twice hold_motion), not on jitter.
+        if self.path > 2 * self.hold_motion:
+            self.still_since = None
+            self.holding = False
+        elif self.path <= self.hold_motion:
+            if self.still_since is None:
+                self.still_since = self.t[self.tail]
+            elif not self.holding and now - self.still_since >= self.hold_time:
+                self.holding = True
+                return 'hold'
+
+        if not self.armed and not self._rearm():
+            return None
+
+        head, tail = self.head, self.tail
+        dx = (self.x[head] - self.x[tail]) / self.palm_size
+        dy = (self.y[head] - self.y[tail]) / self.palm_size
+        distance = math.hypot(dx, dy)
+        rotation = self.angle[head] - self.angle[tail]
+        if (distance >= self.swipe_distance
+                and distance >= self.min_straightness * max(self.path, 1e-6)):
+            if abs(dx) >= abs(dy):
+                event = 'swipe_right' if dx > 0 else 'swipe_left'
+            else:
+                event = 'swipe_down' if dy > 0 else 'swipe_up'
+            self._disarm()
+            return event
+        if abs(rotation) >= self.rotation_degrees and distance < self.swipe_distance:
+            # Image y points down, so a growing angle turns clockwise on screen
+            event = 'rotate_cw' if rotation > 0 else 'rotate_ccw'
+            self._disarm()
+            return event
+        return None
+
+    def _disarm(self):
+        self.armed = False
+        self._clear_window()
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Process several camera feeds or video files at once.
+
+Each stream gets its own capture thread, its own EnhancedHandTracker state
+and a ring of frame slots in shared memory. MediaPipe inference runs in a
+pool of worker processes: a worker reads the frame straight from shared
+memory and only the small landmark array travels back through a queue.
+Each stream is pinned to one worker so MediaPipe's frame-to-frame tracking
+stays valid.
+
+    python multi_stream.py 0 1
+    python multi_stream.py clip1.mp4 clip2.mp4 --workers 2 --mode media
+"""
+
+import argparse
+import multiprocessing as mp
+import queue
+import threading
+import time
+from collections import Counter
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from enhanced_hand_tracker import EnhancedHandTracker
+from hand_identity import role_hands
+from pipeline import StageStats
+
+SLOTS_PER_STREAM = 3
+MODES = ('gesture', 'mouse', 'media')
+
+
+class CountingBackend:
+    """Input backend for streams that must not touch the OS; only counts events."""
+
+    def __init__(self, screen_size=(1920, 1080)):
+        self.screen_size = screen_size
+        self.counts = Counter()
+
+    def size(self):
+        return self.screen_size
+
+    def move(self, x, y):
+        self.counts['move'] += 1
+
+    def click(self):
+        self.counts['click'] += 1
+
+    def press(self, key):
+        self.counts['press'] += 1
+
+
+class FrameSlots:
+    """A ring of equally sized BGR frame buffers in one shared memory block."""
+
+    def __init__(self, shape, count=SLOTS_PER_STREAM, name=None):
+        self.shape = tuple(shape)
+        self.count = count
+        self.slot_bytes = int(np.prod(self.shape))
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes * count)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        self.views = [np.ndarray(self.shape, dtype=np.uint8, buffer=self.shm.buf,
+                                 offset=i * self.slot_bytes) for i in range(count)]
+
+    def close(self):
+        self.views = []
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def inference_worker(tasks, results, tracker_kwargs, mirror):
+    """Worker process: run detection on frames referenced by (stream, slot) tasks."""
+    from hand_tracker import ModernHandTracker
+
+    trackers = {}
+    slots = {}
+    try:
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            stream_id, shm_name, shape, slot, frame_id, captured_at = task
+            if stream_id not in slots:
+                slots[stream_id] = FrameSlots(shape, name=shm_name)
+                trackers[stream_id] = ModernHandTracker(**tracker_kwargs)
+            frame = slots[stream_id].views[slot]
+            start = time.perf_counter()
+            if mirror:
+                cv2.flip(frame, 1, dst=frame)
+            _, hands = trackers[stream_id].find_hands(frame, draw_fancy=False)
+            if hands:
+                points = hands.array / np.array([shape[1], shape[0], 1.0], dtype=np.float32)
+            else:
+                points = np.zeros((0, 21, 3), dtype=np.float32)
+            results.put((stream_id, slot, frame_id, captured_at, points,
+                         [hand.handedness for hand in hands], [hand.score for hand in hands],
+                         time.perf_counter() - start))
+    finally:
+        for frame_slots in slots.values():
+            frame_slots.close()
+
+
+def open_source(source):
+    """Camera index (digits) or video file path."""
+    if source.isdigit():
+        return cv2.VideoCapture(int(source)), True
+    return cv2.VideoCapture(source), False
+
+
+class Stream:
+    """One feed: capture thread, shared frame slots and per-stream tracker state."""
+
+    def __init__(self, stream_id, source, tracker, mode):
+        self.stream_id = stream_id
+        self.source = source
+        self.cap, self.live = open_source(source)
+        if not self.cap.isOpened():
+            raise IOError(f"Tidak dapat membuka sumber {source}")
+        self.tracker = tracker
+        self.mode = mode
+        self.slots = None
+        self.free_slots = queue.Queue()
+        self.captured = 0
+        self.dropped = 0
+        self.finished = False
+        self.gestures = Counter()
+        self.media_actions = Counter()
+        self.inference = StageStats(window=1000)
+        self.latency = StageStats(window=1000)
+        self.processed = StageStats(window=1000)
+        self._scratch_img = None
+
+    def capture_loop(self, tasks, stop):
+        """Read frames into free slots and hand them to this stream's worker."""
+        try:
+            success, pending = self.cap.read()
+            if not success:
+                return
+            self.slots = FrameSlots(pending.shape)
+            for slot in range(self.slots.count):
+                self.free_slots.put(slot)
+            scratch = pending.copy()
+            frame_id = 0
+            while not stop.is_set():
+                try:
+                    # Live cameras drop frames when the worker falls behind;
+                    # files wait so no frame is skipped
+                    if self.live:
+                        slot = self.free_slots.get_nowait()
+                    else:
+                        slot = self.free_slots.get(timeout=0.5)
+                except queue.Empty:
+                    if self.live:
+                        success, scratch = self.cap.read(scratch)
+                        if not success:
+                            break
+                        self.dropped += 1
+                    continue
+                captured_at = time.perf_counter()
+                view = self.slots.views[slot]
+                if pending is not None:
+                    np.copyto(view, pending)
+                    pending = None
+                else:
+                    # Decode straight into the shared slot when OpenCV allows it
+                    success, img = self.cap.read(view)
+                    if not success:
+                        self.free_slots.put(slot)
+                        break
+                    if img.ctypes.data != view.ctypes.data:
+                        np.copyto(view, img)
+                self.captured += 1
+                tasks.put((self.stream_id, self.slots.name, self.slots.shape, slot,
+                           frame_id, captured_at))
+                frame_id += 1
+        finally:
+            self.finished = True
+
+    def handle_result(self, slot, points, handedness, scores, captured_at, inference_seconds):
+        """Run this stream's gesture/mode logic on landmarks returned by a worker."""
+        self.free_slots.put(slot)
+        self.inference.add(inference_seconds)
+
+        now = time.perf_counter()
+        shape = self.slots.shape
+        hands = self.tracker.load_hands(points, handedness, scores, shape)
+        self.tracker.identify_hands(hands, shape, captured_at)
+        if hands:
+            self.tracker.analyze_hands(hands)
+            cursor_hand, action_hand = role_hands(hands)
+            self.gestures[self.tracker.get_gesture(action_hand)] += 1
+            if self.mode == 'mouse':
+                self.tracker.virtual_mouse(cursor_hand, self._scratch(shape), captured_at)
+            elif self.mode == 'media':
+                action = self.tracker.media_controls(action_hand, captured_at)
+                if action != "none":
+                    self.media_actions[action] += 1
+        self.processed.add(time.perf_counter() - now)
+        self.latency.add(time.perf_counter() - captured_at)
+
+    def _scratch(self, shape):
+        # virtual_mouse draws feedback; there is no display here, so reuse one frame
+        if self._scratch_img is None or self._scratch_img.shape != shape:
+            self._scratch_img = np.zeros(shape, dtype=np.uint8)
+        return self._scratch_img
+
+    @property
+    def done(self):
+        return self.finished and self.processed.count == self.captured
+
+    def summary(self, elapsed):
+        return {
+            'source': self.source,
+            'captured': self.captured,
+            'processed': self.processed.count,
+            'dropped': self.dropped,
+            'fps': self.processed.count / elapsed if elapsed > 0 else 0.0,
+            'inference_ms': self.inference.mean_ms,
+            'latency_ms': self.latency.mean_ms,
+            'gestures': dict(self.gestures),
+            'media_actions': dict(self.media_actions),
+        }
+
+    def close(self):
+        self.cap.release()
+        if self.slots is not None:
+            self.slots.close()
+
+
+def run(sources, workers=2, mode='gesture', control=None, mirror=True, duration=None,
+        tracker_kwargs=None):
+    """Process all sources until they end (files), ``duration`` passes or Ctrl+C."""
+    tracker_kwargs = dict(tracker_kwargs or {})
+    workers = max(1, min(workers, len(sources)))
+    ctx = mp.get_context('spawn')
+    task_queues = [ctx.Queue() for _ in range(workers)]
+    results = ctx.Queue()
+    processes = [ctx.Process(target=inference_worker, daemon=True, name=f"inference-{i}",
+                             args=(task_queues[i], results, tracker_kwargs, mirror))
+                 for i in range(workers)]
+    for process in processes:
+        process.start()
+
+    streams = []
+    stop = threading.Event()
+    threads = []
+    started = time.perf_counter()
+    try:
+        for stream_id, source in enumerate(sources):
+            backend = None if stream_id == control else CountingBackend()
+            tracker = EnhancedHandTracker(input_backend=backend, threaded_input=backend is None,
+                                          **tracker_kwargs)
+            streams.append(Stream(stream_id, source, tracker, mode))
+        for stream in streams:
+            thread = threading.Thread(target=stream.capture_loop, daemon=True,
+                                      name=f"capture-{stream.stream_id}",
+                                      args=(task_queues[stream.stream_id % workers], stop))
+            thread.start()
+            threads.append(thread)
+
+        while not all(stream.done for stream in streams):
+            if duration is not None and time.perf_counter() - started >= duration:
+                break
+            try:
+                stream_id, slot, frame_id, captured_at, points, handedness, scores, seconds = \
+                    results.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            streams[stream_id].handle_result(slot, points, handedness, scores, captured_at, seconds)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=1.0)
+        for tasks in task_queues:
+            tasks.put(None)
+        for process in processes:
+            process.join(timeout=5.0)
+            if process.is_alive():
+                process.terminate()
+        elapsed = time.perf_counter() - started
+        for stream in streams:
+            stream.tracker.close()
+            stream.close()
+
+    per_stream = [stream.summary(elapsed) for stream in streams]
+    total = sum(s['processed'] for s in per_stream)
+    return {
+        'elapsed_s': elapsed,
+        'workers': workers,
+        'streams': per_stream,
+        'aggregate': {
+            'processed': total,
+            'dropped': sum(s['dropped'] for s in per_stream),
+            'fps': total / elapsed if elapsed > 0 else 0.0,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Proses beberapa kamera / video sekaligus")
+    parser.add_argument('sources', nargs='+', help="Indeks kamera (mis. 0) atau path video")
+    parser.add_argument('--workers', type=int, default=max(1, mp.cpu_count() - 1),
+                        help="Jumlah proses inferensi")
+    parser.add_argument('--mode', choices=MODES, default='gesture')
+    parser.add_argument('--control', type=int,
+                        help="Indeks stream yang boleh menggerakkan mouse/keyboard asli")
+    parser.add_argument('--no-mirror', action='store_true')
+    parser.add_argument('--duration', type=float, help="Berhenti setelah N detik")
+    parser.add_argument('--inference-width', type=int, default=640)
+    args = parser.parse_args()
+
+    report = run(args.sources, workers=args.workers, mode=args.mode, control=args.control,
+                 mirror=not args.no_mirror, duration=args.duration,
+                 tracker_kwargs={'inference_width': args.inference_width or None})
+    for i, stream in enumerate(report['streams']):
+        print(f"[{i}] {stream['source']}: {stream['processed']} frame, {stream['fps']:.1f} FPS, "
+              f"{stream['dropped']} drop, inferensi {stream['inference_ms']:.1f} ms, "
+              f"latensi {stream['latency_ms']:.1f} ms")
+        print(f"    gesture: {stream['gestures']}")
+    aggregate = report['aggregate']
+    print(f"Total: {aggregate['processed']} frame dalam {report['elapsed_s']:.1f} s, "
+          f"{aggregate['fps']:.1f} FPS, {aggregate['dropped']} drop, {report['workers']} worker")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# overlay.py
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from landmarks import HAND_CONNECTIONS
+
+# 'full' is the original look, 'lite' is a thin skeleton and the essential
+# HUD for production, 'off' draws nothing on the frame
+OVERLAY_LEVELS = ('full', 'lite', 'off')
+
+_ALL_EDGES = np.array(sorted(HAND_CONNECTIONS), dtype=np.intp)
+
+
+def connection_groups(colors, default=(255, 255, 255)):
+    """[(color, (E, 2) edge indices)] so each color is drawn with one polylines call."""
+    groups = {}
+    for edge in sorted(HAND_CONNECTIONS):
+        groups.setdefault(colors.get(edge, default), []).append(edge)
+    return [(color, np.array(edges, dtype=np.intp)) for color, edges in groups.items()]
+
+
+def draw_landmarks(img, points, groups, level='full'):
+    """Draw the skeletons of all hands in ``points`` (N, 21, >=2) in a few batched calls.
+
+    Every edge of every hand becomes a two-point polyline, grouped by color.
+    Joints are zero-length segments drawn with a thick pen, which rasterizes
+    the same discs as cv2.circle, so 'full' looks like the per-line /
+    per-circle drawing it replaces.
+    """
+    if level == 'off' or not len(points):
+        return img
+    xy = np.asarray(points)[..., :2].astype(np.int32)
+    if xy.ndim == 2:
+        xy = xy[np.newaxis]
+    if level == 'lite':
+        cv2.polylines(img, xy[:, _ALL_EDGES].reshape(-1, 2, 2), False, (255, 255, 255), 1)
+        return img
+    for color, edges in groups:
+        cv2.polylines(img, xy[:, edges].reshape(-1, 2, 2), False, color, 2, cv2.LINE_AA)
+    joints = np.repeat(xy.reshape(-1, 1, 2), 2, axis=1)
+    cv2.polylines(img, joints, False, (255, 255, 255), 12)
+    cv2.polylines(img, joints, False, (75, 75, 75), 8)
+    return img
+
+
+class OverlayRenderer:
+    """HUD text as cached sprites, blended onto the frame in one pass.
+
+    Text is queued each frame with ``text()`` and drawn by ``composite()``.
+    A sprite is rendered once per distinct content (text, scale, color, ...)
+    and kept in an LRU cache, so static text costs no rendering and text
+    such as the FPS counter is re-rendered only when its value changes.
+    Sprites are stored premultiplied (color * alpha plus 255 - alpha), so
+    putText's anti-aliased edges blend exactly like drawing on the frame,
+    with one multiply and one add per element over just its own rectangle.
+    """
+
+    def __init__(self, level='full', max_sprites=256):
+        if level not in OVERLAY_LEVELS:
+            raise ValueError(f"overlay level must be one of {OVERLAY_LEVELS}")
+        self.level = level
+        self.max_sprites = max_sprites
+        self.sprites_rendered = 0
+        self._sprites = OrderedDict()
+        self._queue = []
+
+    @property
+    def enabled(self):
+        return self.level != 'off'
+
+    def text(self, text, org, scale, color, thickness=1, font=cv2.FONT_HERSHEY_SIMPLEX,
+             always=False):
+        """Queue ``text`` with putText's arguments (``org`` is the baseline start).
+
+        Text is dropped at level 'off' unless ``always`` is set, which is
+        meant for HUDs the user turned on explicitly.
+        """
+        if self.enabled or always:
+            self._queue.append((('text', text, scale, color, thickness, font), org,
+                                lambda: self._render_text(text, scale, color, thickness, font)))
+
+    def _render_text(self, text, scale, color, thickness, font):
+        (w, h), baseline = cv2.getTextSize(text, font, scale, thickness)
+        pad = thickness + 1
+        bgr = np.zeros((h + baseline + 2 * pad, w + 2 * pad, 3), dtype=np.uint8)
+        alpha = np.zeros(bgr.shape[:2], dtype=np.uint8)
+        origin = (pad, pad + h)
+        cv2.putText(bgr, text, origin, font, scale, color, thickness)
+        cv2.putText(alpha, text, origin, font, scale, 255, thickness)
+        # Drawn on black, bgr is already color * alpha
+        return bgr, cv2.merge([255 - alpha] * 3), (-origin[0], -origin[1])
+
+    def _get_sprite(self, key, render):
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            sprite = self._sprites[key] = render()
+            self.sprites_rendered += 1
+            if len(self._sprites) > self.max_sprites:
+                self._sprites.popitem(last=False)
+        else:
+            self._sprites.move_to_end(key)
+        return sprite
+
+    def composite(self, img):
+        """Blend everything queued this frame onto ``img``, in queue order."""
+        queue, self._queue = self._queue, []
+        h, w = img.shape[:2]
+        for key, (x, y), render in queue:
+            premultiplied, inverse_alpha, (dx, dy) = self._get_sprite(key, render)
+            x0, y0 = x + dx, y + dy
+            sx0, sy0 = max(0, -x0), max(0, -y0)
+            x1 = min(w, x0 + premultiplied.shape[1])
+            y1 = min(h, y0 + premultiplied.shape[0])
+            x0, y0 = max(0, x0), max(0, y0)
+            if x1 <= x0 or y1 <= y0:
+                continue
+            region = img[y0:y1, x0:x1]
+            sx1, sy1 = sx0 + x1 - x0, sy0 + y1 - y0
+            cv2.multiply(region, inverse_alpha[sy0:sy1, sx0:sx1], dst=region, scale=1 / 255)
+            cv2.add(region, premultiplied[sy0:sy1, sx0:sx1], dst=region)
+        return img
+
@@ -0,0 +1,241 @@
+# pipeline.py
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from landmarks import NUM_LANDMARKS
+from profiler import NULL_PROFILER
+
+
+class LatestQueue:
+    """Bounded queue that drops the oldest item when full, so readers always get the newest frame."""
+
+    def __init__(self, maxsize=1, on_drop=None):
+        self._items = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self._closed = False
+        self.on_drop = on_drop
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            dropped = None
+            if len(self._items) == self._items.maxlen:
+                dropped = self._items[0]
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+        if dropped is not None and self.on_drop is not None:
+            self.on_drop(dropped)
+
+    def get(self, timeout=None):
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout)
+            if self._items:
+                return self._items.popleft()
+            return None
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+
+class FrameRing:
+    """A fixed set of reusable frame buffers, handed out and returned by slot index.
+
+    cap.read() decodes straight into a slot's buffer once it has the right
+    shape, so after the first frame per slot no full-size frame is allocated.
+    A slot stays owned from acquire() until release(), so a frame still being
+    rendered is never overwritten by capture.
+    """
+
+    def __init__(self, count):
+        self.buffers = [None] * count
+        self._free = deque(range(count))
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout=None):
+        with self._cond:
+            if not self._free:
+                self._cond.wait(timeout)
+            return self._free.popleft() if self._free else None
+
+    def release(self, slot):
+        with self._cond:
+            self._free.append(slot)
+            self._cond.notify()
+
+    def read(self, cap, slot):
+        success, img = cap.read(self.buffers[slot])
+        if success:
+            self.buffers[slot] = img
+        return success, img
+
+
+class StageStats:
+    """Rolling latency statistics for one pipeline stage."""
+
+    def __init__(self, window=120):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.started = time.perf_counter()
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+
+    @property
+    def mean_ms(self):
+        if not self.samples:
+            return 0.0
+        return 1000.0 * sum(self.samples) / len(self.samples)
+
+    @property
+    def max_ms(self):
+        if not self.samples:
+            return 0.0
+        return 1000.0 * max(self.samples)
+
+    @property
+    def rate(self):
+        elapsed = time.perf_counter() - self.started
+        return self.count / elapsed if elapsed > 0 else 0.0
+
+
+class FramePipeline:
+    """Runs capture and hand inference on worker threads.
+
+    Rendering (mode handling, overlay, imshow) stays on the calling thread
+    because HighGUI windows must be driven from the main thread. Stages are
+    joined by drop-oldest queues, so a slow stage never builds up a backlog.
+    An optional AdaptiveScheduler paces capture and sets the inference width.
+    """
+
+    STAGES = ('capture', 'inference', 'render', 'latency')
+
+    def __init__(self, cap, tracker, queue_size=1, mirror=True, profiler=NULL_PROFILER,
+                 scheduler=None):
+        self.cap = cap
+        self.profiler = profiler
+        self.scheduler = scheduler
+        self.tracker = tracker
+        self.mirror = mirror
+        # Slots alive at once: one per queue entry plus one each in capture,
+        # inference and render
+        self.frames = FrameRing(2 * queue_size + 3)
+        # Landmarks live with their frame slot, so a result's hands stay
+        # valid until render releases the frame, however far inference runs ahead
+        self.landmarks = np.zeros((len(self.frames.buffers), tracker.landmark_buffer.max_hands,
+                                   NUM_LANDMARKS, 3), dtype=np.float32)
+        self.capture_queue = LatestQueue(queue_size, on_drop=self._release_item)
+        self.result_queue = LatestQueue(queue_size, on_drop=self._release_item)
+        self.stats = {name: StageStats() for name in self.STAGES}
+        self._stop = threading.Event()
+        self._threads = []
+        self.error = None
+
+    def start(self):
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="inference", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.capture_queue.close()
+        self.result_queue.close()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+
+    def _capture_loop(self):
+        frame_id = 0
+        while not self._stop.is_set():
+            if self.scheduler is not None:
+                self.scheduler.wait()
+            slot = self.frames.acquire(timeout=0.1)
+            if slot is None:
+                continue
+            start = time.perf_counter()
+            with self.profiler.section('capture'):
+                success, img = self.frames.read(self.cap, slot)
+            if not success:
+                self.frames.release(slot)
+                self.error = "Gagal membaca frame dari kamera!"
+                break
+            self.stats['capture'].add(time.perf_counter() - start)
+            self.capture_queue.put((frame_id, img, start, slot))
+            frame_id += 1
+        self.capture_queue.close()
+
+    def _inference_loop(self):
+        while not self._stop.is_set():
+            item = self.capture_queue.get(timeout=0.1)
+            if item is None:
+                if self.capture_queue.closed:
+                    break
+                continue
+            frame_id, img, captured_at, slot = item
+            start = time.perf_counter()
+            if self.mirror:
+                cv2.flip(img, 1, dst=img)
+            img, hands = self.tracker.find_hands(img, landmarks=self.landmarks[slot])
+            self.stats['inference'].add(time.perf_counter() - start)
+            if self.scheduler is not None:
+                self.scheduler.update(bool(hands), captured_at)
+            self.result_queue.put((frame_id, img, hands, captured_at, slot))
+        self.result_queue.close()
+
+    def results(self):
+        """Yield (frame_id, img, hands, captured_at) for the newest processed frame.
+
+        ``img`` and the landmark arrays in ``hands`` are ring buffers: they are
+        handed back to capture as soon as the next frame is requested, so do
+        not keep them across iterations.
+        """
+        slot = None
+        try:
+            while not self._stop.is_set():
+                item = self.result_queue.get(timeout=0.1)
+                if item is None:
+                    if self.result_queue.closed:
+                        break
+                    continue
+                if slot is not None:
+                    self.frames.release(slot)
+                frame_id, img, hands, captured_at, slot = item
+                yield frame_id, img, hands, captured_at
+        finally:
+            if slot is not None:
+                self.frames.release(slot)
+
+    def _release_item(self, item):
+        self.frames.release(item[-1])
+
+    def record_render(self, seconds, captured_at):
+        self.stats['render'].add(seconds)
+        self.stats['latency'].add(time.perf_counter() - captured_at)
+
+    @property
+    def dropped_frames(self):
+        return self.capture_queue.dropped + self.result_queue.dropped
+
+    def report(self):
+        lines = []
+        for name in self.STAGES:
+            stage = self.stats[name]
+            lines.append(f"{name:<10} mean {stage.mean_ms:6.1f} ms  max {stage.max_ms:6.1f} ms  "
+                         f"{stage.rate:5.1f} /s")
+        lines.append(f"dropped    {self.dropped_frames} frame")
+        return "\n".join(lines)
@@ -0,0 +1,207 @@
+# profiler.py
+import csv
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+
+
+class RingStats:
+    """Fixed-size ring buffer of recent durations (seconds) with percentile queries."""
+
+    __slots__ = ('samples', 'index', 'count')
+
+    def __init__(self, size=300):
+        self.samples = np.zeros(size, dtype=np.float64)
+        self.index = 0
+        self.count = 0
+
+    def add(self, seconds):
+        self.samples[self.index] = seconds
+        self.index = (self.index + 1) % len(self.samples)
+        self.count += 1
+
+    def values(self):
+        return self.samples[:min(self.count, len(self.samples))]
+
+    def summary(self):
+        values = self.values() * 1000.0
+        if not len(values):
+            return {'count': 0, 'mean_ms': 0.0, 'p50_ms': 0.0, 'p95_ms': 0.0, 'p99_ms': 0.0}
+        p50, p95, p99 = np.percentile(values, (50, 95, 99))
+        return {'count': self.count, 'mean_ms': float(values.mean()),
+                'p50_ms': float(p50), 'p95_ms': float(p95), 'p99_ms': float(p99)}
+
+
+class _Section:
+    __slots__ = ('stats', 'start')
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.add(time.perf_counter() - self.start)
+        return False
+
+
+class _NullSection:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SECTION = _NullSection()
+
+
+class Profiler:
+    """Per-stage timers with rolling p50/p95/p99.
+
+    ``with profiler.section('name'):`` or ``@profiler.timed('name')`` record
+    into a fixed-size ring buffer per stage. When disabled, section() hands
+    back a shared no-op context, so instrumented code costs one method call.
+    A section object is reused per name: use each name from one thread only.
+    Different names may be recorded from different threads (the pipeline
+    does), so new stages are registered under a lock and readers work on a
+    snapshot of the stage list.
+    """
+
+    def __init__(self, enabled=False, window=300):
+        self.enabled = enabled
+        self.window = window
+        self.stats = {}
+        self._sections = {}
+        self._lock = threading.Lock()
+
+    def section(self, name):
+        if not self.enabled:
+            return _NULL_SECTION
+        section = self._sections.get(name)
+        if section is None:
+            stats = self._stats(name)
+            with self._lock:
+                section = self._sections.setdefault(name, _Section(stats))
+        return section
+
+    def timed(self, name):
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.section(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def add(self, name, seconds):
+        if self.enabled:
+            self._stats(name).add(seconds)
+
+    def _stats(self, name):
+        stats = self.stats.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self.stats.get(name)
+                if stats is None:
+                    stats = self.stats[name] = RingStats(self.window)
+        return stats
+
+    def summary(self):
+        return {name: stats.summary() for name, stats in list(self.stats.items())}
+
+    def draw_hud(self, overlay, origin=(20, 130)):
+        """Queue the latency table on an OverlayRenderer.
+
+        The HUD is opt-in (--profile or 'p'), so it is shown at every
+        overlay level, including 'off'.
+        """
+        x, y = origin
+        for name, s in self.summary().items():
+            overlay.text(f"{name:<14} {s['p50_ms']:5.1f} {s['p95_ms']:5.1f} {s['p99_ms']:5.1f} ms",
+                         (x, y), 1.1, (255, 255, 255), 1, cv2.FONT_HERSHEY_PLAIN, always=True)
+            y += 18
+
+    def export(self, path):
+        """Write the summary to ``path`` as JSON (.json) or CSV (anything else)."""
+        summary = self.summary()
+        if path.endswith('.json'):
+            with open(path, 'w') as f:
+                json.dump(summary, f, indent=2)
+            return
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['stage', 'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms'])
+            for name, s in summary.items():
+                writer.writerow([name, s['count'], f"{s['mean_ms']:.3f}", f"{s['p50_ms']:.3f}",
+                                 f"{s['p95_ms']:.3f}", f"{s['p99_ms']:.3f}"])
+
+
+class StartupTimer:
+    """Wall-clock phases from process start to the first displayed frame.
+
+    Phases are stored as (start, end) offsets from ``origin``, so phases that
+    run concurrently (camera open and model warm-up) show up as overlapping
+    rows instead of being summed. Phases may be recorded from any thread.
+    """
+
+    def __init__(self, origin=None):
+        self.origin = time.perf_counter() if origin is None else origin
+        self.phases = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, start, end=None):
+        end = time.perf_counter() if end is None else end
+        with self._lock:
+            self.phases[name] = (start - self.origin, end - self.origin)
+
+    def mark(self, name):
+        """A point in time (e.g. the first frame), recorded as a zero-length phase."""
+        now = time.perf_counter()
+        self.add(name, now, now)
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start)
+
+    def timed(self, name, func):
+        """``func`` wrapped to record its run as phase ``name`` (for threads/executors)."""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def total(self):
+        return max((end for _, end in self.phases.values()), default=0.0)
+
+    def report(self):
+        lines = []
+        for name, (start, end) in sorted(self.phases.items(), key=lambda item: item[1]):
+            if end == start:
+                lines.append(f"{name:<12} at {start * 1000:7.0f} ms")
+            else:
+                lines.append(f"{name:<12} {start * 1000:7.0f} -> {end * 1000:7.0f} ms  "
+                             f"({(end - start) * 1000:6.0f} ms)")
+        lines.append(f"{'total':<12} {self.total() * 1000:7.0f} ms")
+        return "\n".join(lines)
+
+
+# Shared disabled profiler for code that has not been given one
+NULL_PROFILER = Profiler(enabled=False)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Offline replay of recorded landmark traces or video files through
+EnhancedHandTracker, with OS input stubbed out. Needs no camera or display.
+
+    python replay.py session.hgt
+    python replay.py --video clip.mp4 --record clip.hgt
+"""
+
+import argparse
+import time
+from collections import Counter
+
+import cv2
+import numpy as np
+
+from enhanced_hand_tracker import EnhancedHandTracker
+from gesture_classifier import RuleClassifier, TemplateClassifier
+from hand_identity import role_hands
+from pipeline import StageStats
+from trace_io import TraceReader, TraceWriter
+
+MODES = ('mouse', 'draw', 'media')
+
+
+class RecordingBackend:
+    """Input backend that records events instead of touching the OS."""
+
+    def __init__(self, screen_size=(1920, 1080)):
+        self.screen_size = screen_size
+        self.events = []
+
+    def size(self):
+        return self.screen_size
+
+    def move(self, x, y):
+        self.events.append(('move', x, y))
+
+    def click(self):
+        self.events.append(('click',))
+
+    def press(self, key):
+        self.events.append(('press', key))
+
+
+class ReplayReport:
+    def __init__(self):
+        self.frames = 0
+        self.hand_frames = 0
+        self.gestures = Counter()
+        self.media_actions = Counter()
+        self.clicks = 0
+        self.stats = {name: StageStats(window=100000) for name in ('gesture',) + MODES}
+
+    def summary(self, backend):
+        moves = sum(1 for event in backend.events if event[0] == 'move')
+        clicks = sum(1 for event in backend.events if event[0] == 'click')
+        lines = [f"frames: {self.frames} ({self.hand_frames} dengan tangan)",
+                 f"gesture: {dict(self.gestures)}",
+                 f"media: {dict(self.media_actions)}",
+                 f"input: {moves} move, {clicks} klik"]
+        for name, stage in self.stats.items():
+            if stage.count:
+                lines.append(f"{name:<8} mean {stage.mean_ms:6.3f} ms  max {stage.max_ms:6.3f} ms")
+        return "\n".join(lines)
+
+
+def trace_frames(tracker, path):
+    """Yield (timestamp, frame_shape, hands) from a recorded trace."""
+    for frame in TraceReader(path):
+        hands = tracker.load_hands(frame.points, frame.handedness, frame.scores, frame.shape)
+        yield frame.timestamp, frame.shape, hands
+
+
+def video_frames(tracker, path, mirror=True):
+    """Yield (timestamp, frame_shape, hands) by running detection on a video file."""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Tidak dapat membuka video {path}")
+    try:
+        while True:
+            success, img = cap.read()
+            if not success:
+                break
+            timestamp = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            if mirror:
+                img = cv2.flip(img, 1)
+            img, hands = tracker.find_hands(img, draw_fancy=False)
+            yield timestamp, img.shape, hands
+    finally:
+        cap.release()
+
+
+def replay(tracker, frames, modes=MODES, writer=None):
+    """Run the mouse/draw/media paths for every frame, timing each one."""
+    report = ReplayReport()
+    img = None
+    for timestamp, shape, hands in frames:
+        report.frames += 1
+        if writer is not None:
+            writer.write(timestamp, hands, shape)
+        if img is None or img.shape != shape:
+            img = np.zeros(shape, dtype=np.uint8)
+        tracker.identify_hands(hands, shape, timestamp)
+        if not hands:
+            continue
+        report.hand_frames += 1
+        cursor_hand, action_hand = role_hands(hands)
+
+        start = time.perf_counter()
+        tracker.analyze_hands(hands)
+        report.gestures[tracker.get_gesture(hands[0])] += 1
+        report.stats['gesture'].add(time.perf_counter() - start)
+
+        if 'mouse' in modes:
+            start = time.perf_counter()
+            tracker.virtual_mouse(cursor_hand, img, timestamp)
+            report.stats['mouse'].add(time.perf_counter() - start)
+        if 'draw' in modes:
+            start = time.perf_counter()
+            tracker.air_drawing(cursor_hand, img)
+            report.stats['draw'].add(time.perf_counter() - start)
+        if 'media' in modes:
+            start = time.perf_counter()
+            action = tracker.media_controls(action_hand, timestamp)
+            report.stats['media'].add(time.perf_counter() - start)
+            if action != "none":
+                report.media_actions[action] += 1
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay landmark trace / video tanpa kamera")
+    parser.add_argument('trace', nargs='?', help="File trace landmark (.hgt)")
+    parser.add_argument('--video', help="Jalankan deteksi pada file video")
+    parser.add_argument('--record', help="Simpan landmark dari video ke file trace")
+    parser.add_argument('--modes', default=','.join(MODES),
+                        help="Mode yang dijalankan, mis. mouse,draw")
+    parser.add_argument('--screen', default='1920x1080', help="Ukuran layar virtual")
+    parser.add_argument('--gesture-templates', help="File template gesture (.npz)")
+    args = parser.parse_args()
+    if not args.trace and not args.video:
+        parser.error("butuh file trace atau --video")
+
+    screen = tuple(int(v) for v in args.screen.split('x'))
+    backend = RecordingBackend(screen)
+    tracker = EnhancedHandTracker(input_backend=backend, threaded_input=False)
+    if args.gesture_templates:
+        tracker.gesture_classifier = TemplateClassifier.load(args.gesture_templates,
+                                                             fallback=RuleClassifier())
+    modes = tuple(mode for mode in args.modes.split(',') if mode)
+
+    writer = TraceWriter(args.record) if args.record else None
+    try:
+        if args.video:
+            frames = video_frames(tracker, args.video)
+        else:
+            frames = trace_frames(tracker, args.trace)
+        report = replay(tracker, frames, modes, writer)
+    finally:
+        if writer is not None:
+            writer.close()
+        tracker.close()
+    print(report.summary(backend))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import cv2
+import numpy as np
+
+from enhanced_hand_tracker import EnhancedHandTracker
+from landmarks import HandLandmarks
+
+
+class NullBackend:
+    def size(self):
+        return (1920, 1080)
+
+    def move(self, x, y):
+        pass
+
+    def click(self):
+        pass
+
+    def press(self, key):
+        pass
+
+
+def drawing_hand(x, y):
+    """Index finger up, middle finger down, index tip at (x, y)."""
+    points = np.zeros((21, 3), dtype=np.float32)
+    points[7, :2] = (x, y + 20)
+    points[8, :2] = (x, y)
+    points[11, :2] = (x + 20, y)
+    points[12, :2] = (x + 20, y + 20)
+    return HandLandmarks(points)
+
+
+def resting_hand():
+    points = np.zeros((21, 3), dtype=np.float32)
+    points[7, :2] = (0, 0)
+    points[8, :2] = (0, 20)
+    return HandLandmarks(points)
+
+
+def draw(tracker, img, path):
+    for x, y in path:
+        tracker.air_drawing(drawing_hand(x, y), img)
+    tracker.air_drawing(resting_hand(), img)
+
+
+def test_single_point_stroke_does_not_take_an_undo_step():
+    tracker = EnhancedHandTracker(input_backend=NullBackend(), threaded_input=False)
+    img = np.zeros((480, 640, 3), dtype=np.uint8)
+    draw(tracker, img, [(100, 100), (200, 100)])
+    drawn = int(np.count_nonzero(tracker.canvas.mask))
+    assert drawn > 0
+
+    # Finger up for a single frame: no segment, so nothing to undo either
+    draw(tracker, img, [(300, 300)])
+    assert len(tracker.drawing_points) == 1
+    assert int(np.count_nonzero(tracker.canvas.mask)) == drawn
+
+    tracker.undo_stroke()
+    assert tracker.drawing_points == []
+    assert np.count_nonzero(tracker.canvas.mask) == 0
+    tracker.close()
+
+
+def test_undo_restores_strokes_one_by_one():
+    tracker = EnhancedHandTracker(input_backend=NullBackend(), threaded_input=False)
+    img = np.zeros((480, 640, 3), dtype=np.uint8)
+    draw(tracker, img, [(100, 100), (200, 100)])
+    first = tracker.canvas.mask.copy()
+    draw(tracker, img, [(100, 300), (200, 300)])
+
+    tracker.undo_stroke()
+    assert len(tracker.drawing_points) == 1
+    assert np.array_equal(tracker.canvas.mask, first)
+    tracker.close()
+
+
+def test_redraw_matches_live_drawing():
+    tracker = EnhancedHandTracker(input_backend=NullBackend(), threaded_input=False)
+    img = np.zeros((480, 640, 3), dtype=np.uint8)
+    draw(tracker, img, [(100, 100), (200, 100), (200, 200)])
+    # Leave a single-point stroke in progress
+    tracker.air_drawing(drawing_hand(400, 400), img)
+    live = tracker.canvas.mask.copy()
+
+    tracker.redraw_canvas()
+    assert np.array_equal(tracker.canvas.mask, live)
+    tracker.close()
+
+
+def test_redraw_of_slow_arc_stays_on_the_drawn_line():
+    tracker = EnhancedHandTracker(input_backend=NullBackend(), threaded_input=False)
+    img = np.zeros((720, 1280, 3), dtype=np.uint8)
+    for i in range(300):
+        angle = np.pi * i / 299
+        tracker.air_drawing(drawing_hand(640 + 250 * np.cos(angle), 400 - 250 * np.sin(angle)), img)
+    live = tracker.canvas.mask.copy()
+    assert len(tracker.drawing_points[-1]) < 100
+
+    tracker.redraw_canvas()
+    redrawn = tracker.canvas.mask
+    # Simplification may move the line by up to the tolerance, never further
+    kernel = np.ones((5, 5), dtype=np.uint8)
+    assert not np.count_nonzero(live & ~cv2.dilate(redrawn, kernel))
+    assert not np.count_nonzero(redrawn & ~cv2.dilate(live, kernel))
+    tracker.close()
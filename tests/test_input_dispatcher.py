@@ -0,0 +1,45 @@
+import threading
+
+from input_dispatcher import InputDispatcher
+
+
+class BlockingBackend:
+    """Records injected input; the first move blocks until released."""
+
+    def __init__(self):
+        self.calls = []
+        self.moving = threading.Event()
+        self.release = threading.Event()
+
+    def size(self):
+        return (1920, 1080)
+
+    def move(self, x, y):
+        self.calls.append(('move', x, y))
+        if not self.moving.is_set():
+            self.moving.set()
+            self.release.wait(1.0)
+
+    def click(self):
+        self.calls.append(('click',))
+
+    def press(self, key):
+        self.calls.append(('press', key))
+
+
+def test_stop_injects_queued_input():
+    backend = BlockingBackend()
+    dispatcher = InputDispatcher(backend).start()
+    dispatcher.move_to(1, 1)
+    assert backend.moving.wait(1.0)
+
+    # Queued while the worker is busy, then stopped before it gets to them
+    dispatcher.move_to(2, 2)
+    dispatcher.click()
+    dispatcher.press('space')
+    stopper = threading.Thread(target=dispatcher.stop)
+    stopper.start()
+    backend.release.set()
+    stopper.join()
+
+    assert backend.calls == [('move', 1, 1), ('move', 2, 2), ('click',), ('press', 'space')]
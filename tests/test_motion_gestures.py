@@ -0,0 +1,58 @@
+import math
+
+import numpy as np
+
+from motion_gestures import MotionTracker
+
+FPS = 30
+
+
+def hand(x, y, angle=0.0, palm=80.0):
+    """Palm centred at (x, y); thumb tip -> index tip points along ``angle`` degrees."""
+    points = np.zeros((21, 3), dtype=np.float32)
+    points[:, 0], points[:, 1] = x, y
+    points[0, :2] = (x, y + palm / 2)
+    points[9, :2] = (x, y - palm / 2)
+    a = math.radians(angle)
+    points[4, :2] = (x - 40 * math.cos(a), y - 40 * math.sin(a))
+    points[8, :2] = (x + 40 * math.cos(a), y + 40 * math.sin(a))
+    return points
+
+
+def events(frames):
+    tracker = MotionTracker()
+    fired = []
+    for i, (x, y, angle) in enumerate(frames):
+        event = tracker.update(hand(x, y, angle), i / FPS)
+        if event is not None and event != 'hold':
+            fired.append(event)
+    return fired
+
+
+def still(x, y, angle, count, rng, noise=2.0):
+    return [(x + rng.normal(0, noise), y + rng.normal(0, noise), angle + rng.normal(0, noise))
+            for _ in range(count)]
+
+
+def test_steady_swipe_fires_once():
+    # About one second across the frame, then the hand stops
+    swipe = [(100 + 1080 * i / FPS, 360, 0) for i in range(FPS + 1)]
+    assert events(swipe + [(1180, 360, 0)] * 20) == ['swipe_right']
+
+
+def test_continuous_rotation_fires_once():
+    rotation = [(640, 360, 10 * i) for i in range(36)]
+    assert events(rotation + [(640, 360, 350)] * 20) == ['rotate_cw']
+
+
+def test_jitter_does_not_fire():
+    rng = np.random.default_rng(0)
+    assert events(still(640, 360, 0, 200, rng, noise=4.0)) == []
+
+
+def test_rearms_after_the_hand_stops():
+    rng = np.random.default_rng(1)
+    right = [(100 + 1080 * i / FPS, 360, 0) for i in range(FPS + 1)]
+    left = [(1180 - 1080 * i / FPS, 360, 0) for i in range(FPS + 1)]
+    frames = right + still(1180, 360, 0, 15, rng) + left
+    assert events(frames) == ['swipe_right', 'swipe_left']
@@ -0,0 +1,94 @@
+# trace_io.py
+import struct
+
+import numpy as np
+
+from landmarks import NUM_LANDMARKS
+
+# File layout (little endian):
+#   header: magic "HGTR", version u16
+#   per frame: timestamp f64, frame width u16, frame height u16, hand count u8
+#   per hand:  handedness u8 (0 unknown, 1 left, 2 right), score f32,
+#              21 x 3 f32 landmarks normalized to the frame
+MAGIC = b'HGTR'
+VERSION = 1
+HEADER = struct.Struct('<4sH')
+FRAME = struct.Struct('<dHHB')
+HAND = struct.Struct('<Bf')
+LANDMARK_BYTES = NUM_LANDMARKS * 3 * 4
+
+HANDEDNESS_CODES = {None: 0, 'Left': 1, 'Right': 2}
+HANDEDNESS_LABELS = {code: label for label, code in HANDEDNESS_CODES.items()}
+
+
+class TraceFrame:
+    """One recorded frame: normalized (n, 21, 3) landmarks plus handedness and scores."""
+
+    __slots__ = ('timestamp', 'width', 'height', 'points', 'handedness', 'scores')
+
+    def __init__(self, timestamp, width, height, points, handedness, scores):
+        self.timestamp = timestamp
+        self.width = width
+        self.height = height
+        self.points = points
+        self.handedness = handedness
+        self.scores = scores
+
+    @property
+    def shape(self):
+        return (self.height, self.width, 3)
+
+
+class TraceWriter:
+    """Appends per-frame landmarks, handedness and timestamps to a binary trace file."""
+
+    def __init__(self, path):
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION))
+        self.frames = 0
+
+    def write(self, timestamp, hands, frame_shape):
+        h, w = frame_shape[:2]
+        self.file.write(FRAME.pack(timestamp, w, h, len(hands)))
+        scale = np.array([w, h, 1.0], dtype=np.float32)
+        for hand in hands:
+            self.file.write(HAND.pack(HANDEDNESS_CODES.get(hand.handedness, 0), hand.score))
+            self.file.write((hand.points / scale).astype('<f4').tobytes())
+        self.frames += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TraceReader:
+    """Iterates the TraceFrames of a file written by TraceWriter."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __iter__(self):
+        with open(self.path, 'rb') as f:
+            magic, version = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{self.path} is not a landmark trace")
+            if version != VERSION:
+                raise ValueError(f"Unsupported trace version {version}")
+            while True:
+                chunk = f.read(FRAME.size)
+                if len(chunk) < FRAME.size:
+                    return
+                timestamp, w, h, count = FRAME.unpack(chunk)
+                points = np.empty((count, NUM_LANDMARKS, 3), dtype=np.float32)
+                handedness, scores = [], []
+                for i in range(count):
+                    code, score = HAND.unpack(f.read(HAND.size))
+                    handedness.append(HANDEDNESS_LABELS.get(code))
+                    scores.append(score)
+                    points[i] = np.frombuffer(f.read(LANDMARK_BYTES), dtype='<f4').reshape(NUM_LANDMARKS, 3)
+                yield TraceFrame(timestamp, w, h, points, handedness, scores)